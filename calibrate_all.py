@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Run HSV and piste calibration in a single decode pass over the video.
+
+Decoding is the costly part of both calibration tools, so frames are read
+once and handed to the HSV histograms (first frames) and to the piste
+voting (every SAMPLE_RATE-th frame). calibrate_hsv.py and
+calibrate_pistes.py call this with only their own analysis enabled.
+"""
+
+import cv2
+
+import calibrate_hsv
+import calibrate_pistes
+from sources.video_file import VideoFileSource
+
+VIDEO_PATH = "data/test.mp4"
+
+
+def calibrate(video_path: str = VIDEO_PATH, hsv: bool = True, pistes: bool = True):
+    """
+    Decode the video once and print the enabled calibration reports.
+
+    Args:
+        video_path: Video to analyse
+        hsv: Run the HSV color distribution analysis (calibrate_hsv)
+        pistes: Run the piste position voting (calibrate_pistes)
+    """
+    # Decode in a background thread while this thread runs the analyses
+    source = VideoFileSource(video_path, loop=False, threaded=True)
+    total_frames = int(source.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    frame_h = int(source.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+    hsv_frames = calibrate_hsv.SAMPLE_FRAMES if hsv else 0
+    piste_frames = 0
+    if pistes:
+        piste_samples = min(calibrate_pistes.MAX_SAMPLES,
+                            (total_frames + calibrate_pistes.SAMPLE_RATE - 1) // calibrate_pistes.SAMPLE_RATE)
+        piste_frames = (piste_samples - 1) * calibrate_pistes.SAMPLE_RATE + 1 if piste_samples else 0
+
+    hsv_acc = None
+    if hsv:
+        print("Analyzing HSV color distribution in video...")
+        hsv_acc = calibrate_hsv.HsvAccumulator()
+    voter = None
+    if pistes:
+        print(f"Scanning {piste_samples} frames...")
+        voter = calibrate_pistes.PisteVoter(frame_h)
+
+    # Decode sequentially up to the last frame either analysis needs: seeking
+    # with CAP_PROP_POS_FRAMES re-decodes a whole GOP on every call.
+    for frame_idx in range(max(hsv_frames, piste_frames)):
+        ret, frame = source.read()
+        if not ret:
+            break
+        if frame_idx < hsv_frames:
+            hsv_acc.add(frame)
+        if frame_idx < piste_frames and frame_idx % calibrate_pistes.SAMPLE_RATE == 0:
+            voter.add(frame)
+
+    source.release()
+
+    if hsv_acc is not None:
+        hsv_acc.close()
+        hsv_acc.report()
+    if voter is not None:
+        voter.report()
+
+
+if __name__ == "__main__":
+    calibrate()
@@ -1,77 +1,174 @@
 #!/usr/bin/env python3
 """HSV calibration tool to find piste color range."""
 
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import cv2
 import numpy as np
-from sources.video_file import VideoFileSource
 
-def main():
-    VIDEO_PATH = "data/test.mp4"
-    
-    source = VideoFileSource(VIDEO_PATH)
-    
-    # Read a few frames and analyze HSV
-    hue_values = []
-    sat_values = []
-    val_values = []
-    
-    print("Analyzing HSV color distribution in video...")
-    
-    for frame_idx in range(50):  # sample 50 frames
-        ret, frame = source.read()
-        if not ret:
-            break
-        
-        # Convert to HSV
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-        
-        # Flatten and collect all HSV values (skip very dark/bright areas)
-        h = hsv[:, :, 0].flatten()
-        s = hsv[:, :, 1].flatten()
-        v = hsv[:, :, 2].flatten()
-        
-        # Filter to moderate brightness/saturation (likely piste area, not shadows/sky)
-        mask = (v > 50) & (v < 200) & (s > 20) & (s < 255)
-        
-        hue_values.extend(h[mask])
-        sat_values.extend(s[mask])
-        val_values.extend(v[mask])
-    
-    source.release()
-    
-    if not hue_values:
+VIDEO_PATH = "data/test.mp4"
+SAMPLE_FRAMES = 50  # frames analysed from the start of the video
+
+# cvtColor is already internally threaded, so more workers stop paying off
+MAX_WORKERS = min(4, os.cpu_count() or 1)
+
+
+# Per-process HSV and mask buffers, reused across frames of the same size
+_hsv_buf = None
+_mask_buf = None
+
+
+def _init_worker():
+    # One OpenCV thread per worker process to avoid oversubscription
+    cv2.setNumThreads(1)
+
+
+def _frame_histograms(frame):
+    """Per-value H/S/V pixel counts for one BGR frame (run in a worker process)."""
+    global _hsv_buf, _mask_buf
+    if _hsv_buf is None or _hsv_buf.shape != frame.shape:
+        _hsv_buf = np.empty_like(frame)
+        _mask_buf = np.empty(frame.shape[:2], dtype=np.uint8)
+
+    # Convert to HSV into the reused buffer
+    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV, dst=_hsv_buf)
+
+    # Filter to moderate brightness/saturation (likely piste area, not shadows/sky):
+    # 50 < v < 200 and 20 < s < 255
+    mask = cv2.inRange(hsv, (0, 21, 51), (255, 254, 199), dst=_mask_buf)
+
+    # Masked histograms per channel, computed without copying the pixels out
+    # (float32 counts are exact: a frame has far fewer than 2**24 pixels)
+    return tuple(
+        cv2.calcHist([hsv], [channel], mask, [bins], [0, bins]).ravel().astype(np.uint64)
+        for channel, bins in ((0, 180), (1, 256), (2, 256))
+    )
+
+
+def _hist_stats(hist):
+    """Compute summary statistics from a per-value pixel histogram.
+
+    Args:
+        hist: 1D array where hist[v] is the number of pixels with value v
+
+    Returns:
+        dict with min, max, mean, std and a `percentile(p)` callable
+    """
+    values = np.arange(hist.size, dtype=np.float64)
+    counts = hist.astype(np.float64)
+    total = counts.sum()
+    nonzero = np.flatnonzero(hist)
+    cdf = np.cumsum(hist)
+
+    mean = (values * counts).sum() / total
+    variance = (values * values * counts).sum() / total - mean * mean
+
+    def percentile(p):
+        return float(np.searchsorted(cdf, p / 100.0 * total))
+
+    return {
+        "min": int(nonzero[0]),
+        "max": int(nonzero[-1]),
+        "mean": mean,
+        "std": float(np.sqrt(max(variance, 0.0))),
+        "percentile": percentile,
+    }
+
+
+class HsvAccumulator:
+    """Accumulate masked H/S/V histograms over frames, analysed in a process pool."""
+
+    def __init__(self):
+        # Per-value pixel counts (hue is 0-179 in OpenCV, saturation/value 0-255)
+        self.h_hist = np.zeros(180, dtype=np.uint64)
+        self.s_hist = np.zeros(256, dtype=np.uint64)
+        self.v_hist = np.zeros(256, dtype=np.uint64)
+        self.n_frames = 0
+
+        # Workers analyse frames while the caller decodes the next ones
+        # (on a single core the pool would only add pickling overhead)
+        self._pool = None
+        if MAX_WORKERS > 1:
+            # Workers are only started on the first submit(), when the caller
+            # may already be running a decoder thread (threaded VideoFileSource):
+            # spawn them instead of forking a process that has live threads
+            self._pool = ProcessPoolExecutor(max_workers=MAX_WORKERS, initializer=_init_worker,
+                                             mp_context=multiprocessing.get_context("spawn"))
+        self._results = []
+
+    def add(self, frame):
+        if self._pool is not None:
+            self._results.append(self._pool.submit(_frame_histograms, frame))
+        else:
+            self._results.append(_frame_histograms(frame))
+        self.n_frames += 1
+
+    def close(self):
+        """Wait for pending frames and fold them into the histograms."""
+        for result in self._results:
+            h_counts, s_counts, v_counts = result.result() if self._pool is not None else result
+            self.h_hist += h_counts
+            self.s_hist += s_counts
+            self.v_hist += v_counts
+        self._results = []
+
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def report(self):
+        report(self.h_hist, self.s_hist, self.v_hist, self.n_frames)
+
+
+def report(h_hist, s_hist, v_hist, n_frames):
+    """Print HSV statistics and suggested PisteDetector ranges from histograms."""
+    total_pixels = int(h_hist.sum())
+    if total_pixels == 0:
         print("No pixels found in value range!")
         return
-    
-    print(f"\nAnalyzed {len(hue_values)} pixels from 50 frames")
+
+    hue = _hist_stats(h_hist)
+    sat = _hist_stats(s_hist)
+    val = _hist_stats(v_hist)
+
+    print(f"\nAnalyzed {total_pixels} pixels from {n_frames} frames")
     print(f"\nHue statistics (0-180):")
-    print(f"  Min: {np.min(hue_values)}, Max: {np.max(hue_values)}")
-    print(f"  Mean: {np.mean(hue_values):.1f}, Std: {np.std(hue_values):.1f}")
-    print(f"  Median: {np.median(hue_values):.1f}")
-    print(f"  25th percentile: {np.percentile(hue_values, 25):.1f}")
-    print(f"  75th percentile: {np.percentile(hue_values, 75):.1f}")
-    
+    print(f"  Min: {hue['min']}, Max: {hue['max']}")
+    print(f"  Mean: {hue['mean']:.1f}, Std: {hue['std']:.1f}")
+    print(f"  Median: {hue['percentile'](50):.1f}")
+    print(f"  25th percentile: {hue['percentile'](25):.1f}")
+    print(f"  75th percentile: {hue['percentile'](75):.1f}")
+
     print(f"\nSaturation statistics (0-255):")
-    print(f"  Min: {np.min(sat_values)}, Max: {np.max(sat_values)}")
-    print(f"  Mean: {np.mean(sat_values):.1f}, Std: {np.std(sat_values):.1f}")
-    print(f"  Median: {np.median(sat_values):.1f}")
-    
+    print(f"  Min: {sat['min']}, Max: {sat['max']}")
+    print(f"  Mean: {sat['mean']:.1f}, Std: {sat['std']:.1f}")
+    print(f"  Median: {sat['percentile'](50):.1f}")
+
     print(f"\nValue (Brightness) statistics (0-255):")
-    print(f"  Min: {np.min(val_values)}, Max: {np.max(val_values)}")
-    print(f"  Mean: {np.mean(val_values):.1f}, Std: {np.std(val_values):.1f}")
-    print(f"  Median: {np.median(val_values):.1f}")
-    
+    print(f"  Min: {val['min']}, Max: {val['max']}")
+    print(f"  Mean: {val['mean']:.1f}, Std: {val['std']:.1f}")
+    print(f"  Median: {val['percentile'](50):.1f}")
+
     # Suggest initial HSV range for piste (typically green or light colored)
-    h_mean = np.mean(hue_values)
-    h_std = np.std(hue_values)
-    
+    h_mean = hue['mean']
+    h_std = hue['std']
+
     print(f"\n\nSuggested HSV ranges for PisteDetector:")
     print(f"  hue_low={int(max(0, h_mean - 2*h_std))}")
     print(f"  hue_high={int(min(180, h_mean + 2*h_std))}")
-    print(f"  saturation_low={int(np.percentile(sat_values, 10))}")
+    print(f"  saturation_low={int(sat['percentile'](10))}")
     print(f"  saturation_high=255")
-    print(f"  brightness_low={int(np.percentile(val_values, 10))}")
+    print(f"  brightness_low={int(val['percentile'](10))}")
     print(f"  brightness_high=255")
 
+
+def main():
+    # Shares the decode pass with calibrate_pistes.py (see calibrate_all.py)
+    from calibrate_all import calibrate
+    calibrate(VIDEO_PATH, pistes=False)
+
+
 if __name__ == "__main__":
     main()
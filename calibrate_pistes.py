@@ -6,86 +6,93 @@ This script scans the video and finds which y-positions are consistently
 detected as pistes across many frames, determining the exact boundaries.
 """
 
-import cv2
 import numpy as np
-from collections import defaultdict
-from vision.piste_detector import PisteDetector
+from vision.piste_detector import PisteDetector, find_bands
 
 VIDEO_PATH = "data/test.mp4"
 
-cap = cv2.VideoCapture(VIDEO_PATH)
-total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+# Sample every N frames to speed up
+SAMPLE_RATE = 5
+MAX_SAMPLES = 100
 
-detector = PisteDetector()
 
-# Track which y-positions are detected as piste content across frames
-piste_votes = defaultdict(int)  # y -> count
+def find_runs(votes: np.ndarray, threshold: float):
+    """
+    Find runs of consecutive rows whose vote count exceeds threshold.
 
-# Sample every N frames to speed up
-sample_rate = 5
-frames_to_process = list(range(0, total_frames, sample_rate))[:100]
-
-print(f"Scanning {len(frames_to_process)} frames...")
-
-for frame_idx in frames_to_process:
-    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
-    ret, frame = cap.read()
-    if not ret:
-        continue
-    
-    pistes = detector.detect(frame)
-    
-    # For each piste, mark those y-positions as "piste pixels"
-    for x1, y1, x2, y2 in pistes:
-        for y in range(y1, y2):
-            piste_votes[y] += 1
-
-cap.release()
-
-# Find clusters of consistently detected pixels
-print("\nPiste position voting results:")
-print(f"y-range  | votes | consensus | analysis")
-print("---------+-------+----------+-------------------")
-
-# Group consecutive pixels with votes
-sorted_y = sorted(piste_votes.keys())
-clusters = []
-current_cluster = []
-threshold = len(frames_to_process) * 0.3  # 30% of frames
-
-for y in sorted_y:
-    votes = piste_votes[y]
-    if votes > threshold:
-        if not current_cluster or y == current_cluster[-1][0] + 1:
-            # Extend current cluster
-            current_cluster.append((y, votes))
-        else:
-            # Start new cluster
-            if current_cluster:
-                clusters.append(current_cluster)
-            current_cluster = [(y, votes)]
-    elif current_cluster:
-        # End cluster
-        clusters.append(current_cluster)
-        current_cluster = []
-
-if current_cluster:
-    clusters.append(current_cluster)
-
-print(f"\nFound {len(clusters)} distinct piste regions:\n")
-
-for i, cluster in enumerate(clusters):
-    y_start = cluster[0][0]
-    y_end = cluster[-1][0]
-    height = y_end - y_start + 1
-    avg_votes = np.mean([v for y, v in cluster])
-    pct = avg_votes / len(frames_to_process) * 100
-    
-    print(f"Piste {i+1}: y={y_start:3d}-{y_end:3d} (h={height:2d}px) - {pct:5.1f}% detected")
-
-print("\n--- Recommended detector parameters ---")
-print("\nPistes should be at these positions:")
-for i, cluster in enumerate(clusters[:4]):
-    y_start = cluster[0][0]
-    y_end = cluster[-1][0]
-    print(f"  Piste {i+1}: y={y_start}-{y_end}")
+    Returns:
+        (starts, ends) int arrays, ends exclusive
+    """
+    return find_bands(votes > threshold)
+
+
+class PisteVoter:
+    """Count, per image row, how many sampled frames detect it as piste."""
+
+    def __init__(self, frame_h: int):
+        self.frame_h = frame_h
+        self.detector = PisteDetector()
+        # Votes are kept as a difference array (+1 at y1, -1 at y2) so a frame
+        # costs O(pistes) instead of O(rows); piste_votes integrates it
+        self._vote_edges = np.zeros(frame_h + 1, dtype=np.int32)
+        self.processed = 0
+
+    @property
+    def piste_votes(self) -> np.ndarray:
+        """Number of sampled frames detecting each row as piste (y -> count)."""
+        return np.cumsum(self._vote_edges[:-1], dtype=np.int32)
+
+    def add(self, frame):
+        self.processed += 1
+        pistes = self.detector.detect(frame)
+        if not pistes:
+            return
+
+        # For each piste, mark those y-positions as "piste pixels"
+        boxes = np.asarray(pistes, dtype=np.int32).reshape(-1, 4)
+        y1 = np.clip(boxes[:, 1], 0, self.frame_h)
+        y2 = np.clip(boxes[:, 3], 0, self.frame_h)
+        keep = y2 > y1
+        np.add.at(self._vote_edges, y1[keep], 1)
+        np.add.at(self._vote_edges, y2[keep], -1)
+
+    def report(self):
+        report(self.piste_votes, self.processed)
+
+
+def report(piste_votes, processed):
+    """Print the piste regions consistently detected across sampled frames."""
+    # Find clusters of consistently detected pixels
+    print("\nPiste position voting results:")
+    print(f"y-range  | votes | consensus | analysis")
+    print("---------+-------+----------+-------------------")
+
+    # Group consecutive rows with enough votes into (start, end) runs, end exclusive
+    starts, ends = find_runs(piste_votes, processed * 0.3)  # 30% of frames
+    clusters = list(zip(starts.tolist(), ends.tolist()))
+
+    print(f"\nFound {len(clusters)} distinct piste regions:\n")
+
+    for i, (y_start, y_stop) in enumerate(clusters):
+        y_end = y_stop - 1
+        height = y_stop - y_start
+        avg_votes = piste_votes[y_start:y_stop].mean()
+        pct = avg_votes / processed * 100
+
+        print(f"Piste {i+1}: y={y_start:3d}-{y_end:3d} (h={height:2d}px) - {pct:5.1f}% detected")
+
+    print("\n--- Recommended detector parameters ---")
+    print("\nPistes should be at these positions:")
+    for i, (y_start, y_stop) in enumerate(clusters[:4]):
+        y_end = y_stop - 1
+        print(f"  Piste {i+1}: y={y_start}-{y_end}")
+
+
+def main():
+    # Shares the decode pass with calibrate_hsv.py (see calibrate_all.py)
+    from calibrate_all import calibrate
+    calibrate(VIDEO_PATH, hsv=False)
+
+
+if __name__ == "__main__":
+    main()
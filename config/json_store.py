@@ -0,0 +1,95 @@
+"""
+Helpers for the JSON state files shared between web server and pipeline.
+
+The pipeline polls these files on every frame while they only change when
+the user interacts with the web UI, so reads go through a cache that only
+re-parses a file when its inode, modification time or size changes.
+
+Writes go to a temporary file that is then renamed over the target with
+os.replace(), which is atomic: readers always see either the old or the new
+content, never a truncated file, so they need no lock.
+"""
+import json
+import os
+import tempfile
+
+
+def atomic_write_json(path: str, data, **dump_kwargs):
+    """
+    Atomically replace `path` with `data` serialised as JSON.
+
+    Args:
+        path: Target file
+        data: JSON-serialisable object
+        **dump_kwargs: Extra arguments for json.dump (e.g. indent)
+    """
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, **dump_kwargs)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class JsonCache:
+    """Cache the parsed content of a JSON file, keyed on its inode, mtime and size."""
+
+    def __init__(self, path: str):
+        self.path = path
+        # (file version, value) and (file version, error), each replaced in a
+        # single assignment so concurrent load() calls never pair a new
+        # version with a stale value
+        self._entry = None
+        self._failed = None  # file version that failed to decode
+
+    def load(self, parse=None):
+        """
+        Return the (parsed) file content, re-reading it only if it changed.
+
+        Safe to call from several threads: a concurrent call either sees the
+        previous entry or the new one.
+
+        Args:
+            parse: Optional callable applied to the decoded JSON before caching
+
+        Returns:
+            Cached value, or None if the file does not exist.
+            Read/decode errors are propagated to the caller; a file version
+            that failed to decode is not re-read until it changes.
+        """
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self.invalidate()
+            return None
+
+        # atomic_write_json replaces the file, so the inode changes on every
+        # write even when mtime (coarse on some filesystems) and size do not
+        key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        entry = self._entry
+        if entry is not None and entry[0] == key:
+            return entry[1]
+        failed = self._failed
+        if failed is not None and failed[0] == key:
+            raise failed[1]
+
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except ValueError as e:
+            self._failed = (key, e)
+            raise
+        value = parse(data) if parse is not None else data
+        self._entry = (key, value)
+        self._failed = None
+        return value
+
+    def invalidate(self):
+        """Forget the cached value so the next load() re-reads the file."""
+        self._entry = None
+        self._failed = None
@@ -0,0 +1,96 @@
+"""
+Combined shared state between web server and pipeline.
+
+ROI, visibility and guard line adjustments live in one JSON file with one
+section each, so a single stat() per frame tells every consumer whether
+anything changed. The web server is the only writer; the pipeline only
+reads (its stats are written separately to pipeline_stats.json).
+"""
+import json
+import os
+import sys
+import threading
+from config.json_store import JsonCache, atomic_write_json
+
+STATE_FILE = os.path.join(os.path.dirname(__file__), "shared_state.json")
+_write_lock = threading.Lock()  # serialises writers; readers need no lock
+_cache = JsonCache(STATE_FILE)
+
+# section -> (raw section dict, parsed value), reused while the file is unchanged
+_parsed = {}
+
+# Last read error reported, so a bad file is logged once rather than every frame
+_last_error = None
+
+def load() -> dict:
+    """Get the whole shared state (empty if the file is missing or unreadable)."""
+    global _last_error
+    try:
+        state = _cache.load()
+    except (OSError, ValueError) as e:
+        if str(e) != _last_error:
+            _last_error = str(e)
+            print(f"[SharedState] Error reading shared state: {e}", file=sys.stderr)
+        return {}
+    _last_error = None
+    return state if state is not None else {}
+
+def get_section(section: str, parse=None):
+    """
+    Get one section of the shared state.
+
+    Args:
+        section: Section name ('roi', 'visibility', 'guard_lines')
+        parse: Optional callable applied to the section, only re-run when it changes
+
+    Returns:
+        Section dict (or parsed value), None if the section is not set
+    """
+    data = load().get(section)
+    if data is None or parse is None:
+        return data
+    cached = _parsed.get(section)
+    if cached is not None and cached[0] is data:
+        return cached[1]
+    value = parse(data)
+    _parsed[section] = (data, value)
+    return value
+
+def _read_for_update() -> dict:
+    try:
+        with open(STATE_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def update(section: str, values: dict, default: dict = None) -> dict:
+    """
+    Merge values into a section and write the file atomically.
+
+    Args:
+        section: Section name
+        values: Keys to set in the section
+        default: Initial content if the section does not exist yet
+
+    Returns:
+        Updated section dict
+    """
+    with _write_lock:
+        state = _read_for_update()
+        updated = dict(state.get(section) or default or {})
+        updated.update(values)
+        state[section] = updated
+        atomic_write_json(STATE_FILE, state, indent=2)
+        _cache.invalidate()
+    return updated
+
+def remove(section: str) -> bool:
+    """Remove a section. Returns True if it was present."""
+    with _write_lock:
+        state = _read_for_update()
+        if section not in state:
+            return False
+        del state[section]
+        atomic_write_json(STATE_FILE, state, indent=2)
+        _cache.invalidate()
+    return True
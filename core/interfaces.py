@@ -6,6 +6,13 @@ class FrameSource(ABC):
     def read(self) -> tuple[bool, np.ndarray]:
         pass
 
+    def read_into(self, out: np.ndarray) -> bool:
+        """Read the next frame into a caller-owned buffer instead of allocating one."""
+        ret, frame = self.read()
+        if ret:
+            np.copyto(out, frame)
+        return ret
+
     @abstractmethod
     def release(self):
         pass
@@ -1,12 +1,17 @@
 import cv2
 import time
-import json
 import os
+import queue
+import threading
+import numpy as np
 from config.shared_roi import get_manual_roi
 from config.shared_visibility import get_piste_visible
 from config.shared_guard_lines import get_guard_lines_adjustments
+from config.json_store import atomic_write_json
 
 STATS_FILE = os.path.join(os.path.dirname(__file__), "..", "config", "pipeline_stats.json")
+STATS_MIN_INTERVAL = 0.25  # seconds between unchanged stats writes (keeps timestamp fresh)
+QUEUE_SIZE = 2  # Max frames waiting between pipeline stages (bounds latency)
 
 class VisionPipeline:
     def __init__(self, source, person_detector, piste_detector, tracker, bout_manager, encoder):
@@ -19,227 +24,345 @@ class VisionPipeline:
         self.fencer_count = 0
         self.guard_validation = {}  # Track fencer positioning on guard lines
         self.roi_signaled = False  # Track if we've already signaled ROI selection to BoutManager
+        self._applied_adjustments = None  # (detector config_version, adjustments) last applied
+        self._guard_line_cache = None  # (detector config_version, precomputed line geometry)
+        self._last_stats_sig = None  # (fencer_count, guard_validation items) last written
+        self._last_stats_ts = 0.0  # time.monotonic() of the last stats write
+        self._frame_bufs = None  # Ring of frame buffers shared by the stages (allocated on first frame)
+        self._stop = threading.Event()
+        self._stage_error = None  # Exception raised in a stage thread, re-raised by run()
 
     def _save_stats(self):
-        """Save pipeline stats to JSON file for web API"""
+        """Save pipeline stats to JSON file for web API (skipped when unchanged)"""
+        sig = (self.fencer_count, frozenset(self.guard_validation.items()))
+        now = time.monotonic()
+        if sig == self._last_stats_sig and now - self._last_stats_ts < STATS_MIN_INTERVAL:
+            return
         try:
             stats = {
                 "fencer_count": self.fencer_count,
                 "guard_validation": self.guard_validation,
                 "timestamp": time.time()
             }
-            with open(STATS_FILE, 'w') as f:
-                json.dump(stats, f)
+            atomic_write_json(STATS_FILE, stats)
+            self._last_stats_sig = sig
+            self._last_stats_ts = now
         except Exception as e:
             print(f"[Pipeline] Failed to save stats: {e}")
 
-    def run(self):
-        while True:
-            ret, frame = self.source.read()
-            if not ret:
-                break
-
-            # Detect pistes (list of regions)
-            piste_bboxes = self.piste_detector.detect(frame)
-
-            # Check if a ROI has been selected by user
-            current_roi = get_manual_roi()
-            if current_roi is not None and not self.roi_signaled:
-                self.bout_manager.signal_roi_selected(current_roi)
-                self.roi_signaled = True
-            
-            # If ROI was cleared, reset the signal
-            if current_roi is None:
-                self.roi_signaled = False
-
-            # Decide whether to apply ROI filtering based on bout phase
-            # In WAITING: No ROI filtering (awaiting ROI selection)
-            # In INITIALIZING: ROI filtering ON (only detect fencers on the piste)
-            # In BOUT_ACTIVE: ROI filtering ON (track only on piste)
-            apply_roi_filter = self.bout_manager.should_apply_roi_filter()
-            
-            # Apply color filtering (white/gray fencers only) to exclude referee and spectators
-            apply_color_filter = True  # Always filter for white/gray clothing
-            
-            # Detect persons (fencers) - with optional ROI filtering and color filtering
-            detections = self.person_detector.detect(frame, apply_roi_filter=apply_roi_filter, apply_color_filter=apply_color_filter)
-            
-            # Update fencer tracker with detections
-            # Returns (tracks, frame_info) where tracks are the tracked fencers
-            # Pass guard_line_detector to help identify fencers by guard line position
-            tracks, track_info = self.tracker.update(detections, guard_line_detector=self.bout_manager.guard_line_detector)
-            
-            # Validate that fencers are on their correct guard lines
-            guard_validation = self.tracker.validate_fencers_on_guard_lines(
-                self.bout_manager.guard_line_detector,
-                current_detections=detections
+    def _apply_guard_line_adjustments(self):
+        """Apply guard line adjustments from shared state when they changed."""
+        detector = self.bout_manager.guard_line_detector
+        adjustments = get_guard_lines_adjustments()
+        if not detector.piste_roi or not adjustments:
+            return
+        # Skip if these adjustments were already applied to the current ROI
+        if self._applied_adjustments == (detector.config_version, adjustments):
+            return
+        
+        # Apply left line adjustment
+        if adjustments.get('left_offset') is not None or adjustments.get('left_tilt') is not None:
+            detector.adjust_guard_line(
+                'left',
+                offset_x=adjustments.get('left_offset', 0),
+                tilt=adjustments.get('left_tilt', 1.0)
             )
-            track_info['guard_validation'] = guard_validation
-            
-            # Update bout manager state based on tracker status
-            current_phase = self.bout_manager.transition(track_info)
-            
-            # Save fencer count and tracker status to stats file
-            self.fencer_count = len(tracks)
-            self.guard_validation = guard_validation  # Store validation results for web API
-            self._save_stats()
+        # Apply right line adjustment
+        if adjustments.get('right_offset') is not None or adjustments.get('right_tilt') is not None:
+            detector.adjust_guard_line(
+                'right',
+                offset_x=adjustments.get('right_offset', 0),
+                tilt=adjustments.get('right_tilt', 1.0)
+            )
+        # Apply center line adjustment
+        if adjustments.get('center_offset') is not None or adjustments.get('center_tilt') is not None:
+            detector.adjust_guard_line(
+                'center',
+                offset_x=adjustments.get('center_offset', 0),
+                tilt=adjustments.get('center_tilt', 1.0)
+            )
+        self._applied_adjustments = (detector.config_version, dict(adjustments))
 
-            # Draw overlays
-            vis = frame.copy()
-            
-            # Apply any pending guard line adjustments from shared state
-            adjustments = get_guard_lines_adjustments()
-            if self.bout_manager.guard_line_detector.piste_roi and adjustments:
-                # Apply left line adjustment
-                if adjustments.get('left_offset') is not None or adjustments.get('left_tilt') is not None:
-                    self.bout_manager.guard_line_detector.adjust_guard_line(
-                        'left',
-                        offset_x=adjustments.get('left_offset', 0),
-                        tilt=adjustments.get('left_tilt', 1.0)
-                    )
-                # Apply right line adjustment
-                if adjustments.get('right_offset') is not None or adjustments.get('right_tilt') is not None:
-                    self.bout_manager.guard_line_detector.adjust_guard_line(
-                        'right',
-                        offset_x=adjustments.get('right_offset', 0),
-                        tilt=adjustments.get('right_tilt', 1.0)
-                    )
-                # Apply center line adjustment
-                if adjustments.get('center_offset') is not None or adjustments.get('center_tilt') is not None:
-                    self.bout_manager.guard_line_detector.adjust_guard_line(
-                        'center',
-                        offset_x=adjustments.get('center_offset', 0),
-                        tilt=adjustments.get('center_tilt', 1.0)
-                    )
-            
-            # Draw guard lines if ROI is configured AND piste is set to be visible
-            guard_line_viz = self.bout_manager.guard_line_detector.get_visualization_lines()
-            if guard_line_viz and get_piste_visible():
-                try:
-                    x1_roi, y1_roi, x2_roi, y2_roi = guard_line_viz.get('piste_roi', (0, 0, 0, 0))
-                    center_x_roi = (x1_roi + x2_roi) / 2.0
-                    
-                    # Draw piste boundary rectangle
-                    cv2.rectangle(vis, (int(x1_roi), int(y1_roi)), (int(x2_roi), int(y2_roi)), 
-                                (100, 100, 100), 2)
-                    
-                    # Perspective effect: lines diverge away from center as they go deeper
-                    # Can be adjusted via tilt factors
-                    left_tilt = guard_line_viz.get('left_tilt', 1.0)
-                    right_tilt = guard_line_viz.get('right_tilt', 1.0)
-                    center_tilt = guard_line_viz.get('center_tilt', 1.0)
-                    perspective_factor = 0.15  # Divergence factor for depth effect
-                    piste_depth = y2_roi - y1_roi
-                    
-                    # Left guard line (5m length) - GREEN vertical line with adjustable perspective
-                    left_x = guard_line_viz.get('guard_line_left_x')
-                    if left_x:
-                        # Top of line (near camera)
-                        x_top = int(left_x)
-                        # Bottom of line (far from camera) - diverges away from center with tilt
-                        divergence = (center_x_roi - left_x) * perspective_factor * left_tilt
-                        x_bottom = int(left_x - divergence)
-                        
-                        # Draw thick line with perspective
-                        cv2.line(vis, (x_top, int(y1_roi)), (x_bottom, int(y2_roi)), (0, 255, 0), 3)
-                        # Draw top marker
-                        cv2.circle(vis, (x_top, int(y1_roi) - 20), 8, (0, 255, 0), -1)
-                        # Draw bottom marker
-                        cv2.circle(vis, (x_bottom, int(y2_roi) + 20), 8, (0, 255, 0), -1)
-                        # Draw label
-                        cv2.putText(vis, "5m", (x_top - 15, int(y1_roi) - 40),
-                                  cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
-                    
-                    # Right guard line (9m length) - GREEN vertical line with adjustable perspective
-                    right_x = guard_line_viz.get('guard_line_right_x')
-                    if right_x:
-                        # Top of line (near camera)
-                        x_top = int(right_x)
-                        # Bottom of line (far from camera) - diverges away from center with tilt
-                        divergence = (right_x - center_x_roi) * perspective_factor * right_tilt
-                        x_bottom = int(right_x + divergence)
-                        
-                        # Draw thick line with perspective
-                        cv2.line(vis, (x_top, int(y1_roi)), (x_bottom, int(y2_roi)), (0, 255, 0), 3)
-                        # Draw top marker
-                        cv2.circle(vis, (x_top, int(y1_roi) - 20), 8, (0, 255, 0), -1)
-                        # Draw bottom marker
-                        cv2.circle(vis, (x_bottom, int(y2_roi) + 20), 8, (0, 255, 0), -1)
-                        # Draw label
-                        cv2.putText(vis, "9m", (x_top - 15, int(y1_roi) - 40),
-                                  cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
-                    
-                    # Center line (7m length) - BLUE vertical line with adjustable perspective
-                    center_x = guard_line_viz.get('center_x')
-                    if center_x:
-                        # Center line typically stays mostly straight but can have slight tilt
-                        x_top = int(center_x)
-                        # Minimal divergence for center (usually center_tilt = 1.0 for straight)
-                        divergence = (center_tilt - 1.0) * perspective_factor * (right_x - left_x) if right_x and left_x else 0
-                        x_bottom = int(center_x + divergence)
-                        
-                        # Draw vertical line with adjustable perspective
-                        cv2.line(vis, (x_top, int(y1_roi)), (x_bottom, int(y2_roi)), (255, 100, 0), 2)
-                        # Small markers
-                        cv2.circle(vis, (x_top, int(y1_roi) - 20), 5, (255, 100, 0), -1)
-                        cv2.circle(vis, (x_bottom, int(y2_roi) + 20), 5, (255, 100, 0), -1)
-                except Exception as e:
-                    print(f"[Pipeline] Error drawing guard lines: {e}")
-            
-            # Draw bout phase at top
-            phase_text = self.bout_manager.get_phase_display()
-            cv2.putText(vis, phase_text, (10, 40), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 255), 2)
+    def _guard_line_geometry(self, guard_line_viz):
+        """
+        Precompute integer drawing coordinates for the piste and guard lines.
+        
+        Returns:
+            (roi_rect, lines) where each line is
+            (top, bottom, top_marker, bottom_marker, color, thickness, radius, label, label_org)
+        """
+        x1_roi, y1_roi, x2_roi, y2_roi = guard_line_viz.get('piste_roi', (0, 0, 0, 0))
+        center_x_roi = (x1_roi + x2_roi) / 2.0
+        y_top = int(y1_roi)
+        y_bottom = int(y2_roi)
+        
+        # Perspective effect: lines diverge away from center as they go deeper
+        # Can be adjusted via tilt factors
+        left_tilt = guard_line_viz.get('left_tilt', 1.0)
+        right_tilt = guard_line_viz.get('right_tilt', 1.0)
+        center_tilt = guard_line_viz.get('center_tilt', 1.0)
+        perspective_factor = 0.15  # Divergence factor for depth effect
+        
+        def line(x_top, x_bottom, color, thickness, radius, label=None):
+            return ((x_top, y_top), (x_bottom, y_bottom),
+                    (x_top, y_top - 20), (x_bottom, y_bottom + 20),
+                    color, thickness, radius, label, (x_top - 15, y_top - 40))
+        
+        lines = []
+        
+        # Left guard line (5m length) - GREEN, bottom diverges away from center with tilt
+        left_x = guard_line_viz.get('guard_line_left_x')
+        if left_x:
+            divergence = (center_x_roi - left_x) * perspective_factor * left_tilt
+            lines.append(line(int(left_x), int(left_x - divergence), (0, 255, 0), 3, 8, "5m"))
+        
+        # Right guard line (9m length) - GREEN, bottom diverges away from center with tilt
+        right_x = guard_line_viz.get('guard_line_right_x')
+        if right_x:
+            divergence = (right_x - center_x_roi) * perspective_factor * right_tilt
+            lines.append(line(int(right_x), int(right_x + divergence), (0, 255, 0), 3, 8, "9m"))
+        
+        # Center line (7m length) - BLUE, mostly straight (center_tilt = 1.0)
+        center_x = guard_line_viz.get('center_x')
+        if center_x:
+            divergence = (center_tilt - 1.0) * perspective_factor * (right_x - left_x) if right_x and left_x else 0
+            lines.append(line(int(center_x), int(center_x + divergence), (255, 100, 0), 2, 5))
+        
+        roi_rect = ((int(x1_roi), y_top), (int(x2_roi), y_bottom))
+        return roi_rect, lines
+
+    def _draw_guard_lines(self, frame, geometry):
+        """Draw precomputed piste boundary and guard lines onto the frame."""
+        roi_rect, lines = geometry
+        
+        # Draw piste boundary rectangle
+        cv2.rectangle(frame, roi_rect[0], roi_rect[1], (100, 100, 100), 2)
+        
+        for top, bottom, top_marker, bottom_marker, color, thickness, radius, label, label_org in lines:
+            cv2.line(frame, top, bottom, color, thickness)
+            cv2.circle(frame, top_marker, radius, color, -1)
+            cv2.circle(frame, bottom_marker, radius, color, -1)
+            if label:
+                cv2.putText(frame, label, label_org, cv2.FONT_HERSHEY_SIMPLEX, 0.8, color, 2)
+
+    def _analyse(self, frame):
+        """Detection stage: detect, track and update bout state for one frame."""
+        # Detect pistes (list of regions)
+        piste_bboxes = self.piste_detector.detect(frame)
+
+        # Check if a ROI has been selected by user
+        current_roi = get_manual_roi()
+        if current_roi is not None and not self.roi_signaled:
+            self.bout_manager.signal_roi_selected(current_roi)
+            self.roi_signaled = True
+        
+        # If ROI was cleared, reset the signal
+        if current_roi is None:
+            self.roi_signaled = False
+
+        # Apply any pending guard line adjustments from shared state
+        self._apply_guard_line_adjustments()
+
+        # Decide whether to apply ROI filtering based on bout phase
+        # In WAITING: No ROI filtering (awaiting ROI selection)
+        # In INITIALIZING: ROI filtering ON (only detect fencers on the piste)
+        # In BOUT_ACTIVE: ROI filtering ON (track only on piste)
+        apply_roi_filter = self.bout_manager.should_apply_roi_filter()
+        
+        # Apply color filtering (white/gray fencers only) to exclude referee and spectators
+        apply_color_filter = True  # Always filter for white/gray clothing
+        
+        # Detect persons (fencers) - with optional ROI filtering and color filtering
+        detections = self.person_detector.detect(frame, apply_roi_filter=apply_roi_filter, apply_color_filter=apply_color_filter)
+        
+        # Update fencer tracker with detections
+        # Returns (tracks, frame_info) where tracks are the tracked fencers
+        # Pass guard_line_detector to help identify fencers by guard line position
+        tracks, track_info = self.tracker.update(detections, guard_line_detector=self.bout_manager.guard_line_detector)
+        
+        # Validate that fencers are on their correct guard lines
+        guard_validation = self.tracker.validate_fencers_on_guard_lines(
+            self.bout_manager.guard_line_detector,
+            current_detections=detections
+        )
+        track_info['guard_validation'] = guard_validation
+        
+        # Update bout manager state based on tracker status
+        current_phase = self.bout_manager.transition(track_info)
+        
+        # Save fencer count and tracker status to stats file
+        self.fencer_count = len(tracks)
+        self.guard_validation = guard_validation  # Store validation results for web API
+        self._save_stats()
+
+        # Snapshot bout state now so the overlay matches this frame
+        phase_text = self.bout_manager.get_phase_display()
+        # Optimal framing box (to keep both fencers in view) with smoothing
+        frame_box = self.bout_manager.smooth_frame_box(track_info.get('frame_box'))
+
+        return tracks, track_info, phase_text, frame_box
+
+    def _draw_overlays(self, frame, tracks, track_info, phase_text, frame_box):
+        """Overlay stage: draw guard lines, tracks and status onto the frame."""
+        # Draw overlays directly on the decoded frame: detection is done with
+        # it and the buffer only goes back to the reader after encoding
+        
+        # Draw guard lines if ROI is configured AND piste is set to be visible
+        detector = self.bout_manager.guard_line_detector
+        if detector.piste_roi and get_piste_visible():
+            try:
+                # Line coordinates only change with the ROI or an adjustment
+                if self._guard_line_cache is None or self._guard_line_cache[0] != detector.config_version:
+                    geometry = self._guard_line_geometry(detector.get_visualization_lines())
+                    self._guard_line_cache = (detector.config_version, geometry)
+                self._draw_guard_lines(frame, self._guard_line_cache[1])
+            except Exception as e:
+                print(f"[Pipeline] Error drawing guard lines: {e}")
+        
+        # Draw bout phase at top
+        cv2.putText(frame, phase_text, (10, 40), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 255), 2)
+        
+        # Draw tracked fencers with their IDs
+        for track in tracks:
+            bbox = track.get('bbox')
+            track_id = track.get('id', 0)
             
-            # Draw tracked fencers with their IDs
-            for track in tracks:
-                bbox = track.get('bbox')
-                track_id = track.get('id', 0)
+            if bbox and len(bbox) == 4:
+                x1, y1, x2, y2 = bbox
                 
-                if bbox and len(bbox) == 4:
-                    x1, y1, x2, y2 = bbox
-                    
-                    # Color and style based on fencer ID
-                    if track_id == 1:
-                        # Fencer 1 - BLUE
-                        color = (255, 0, 0)  # BGR: Blue
-                        thickness = 3
-                        label = 'Fencer 1'
-                    elif track_id == 2:
-                        # Fencer 2 - ORANGE
-                        color = (0, 165, 255)  # BGR: Orange
-                        thickness = 3
-                        label = 'Fencer 2'
-                    elif track_id >= 100:
-                        # Other detections - YELLOW (provisional, not locked)
-                        color = (0, 255, 255)  # BGR: Yellow
-                        thickness = 1
-                        label = f'Other'
-                    else:
-                        # Fallback
-                        color = (200, 200, 200)  # Gray
-                        thickness = 1
-                        label = f'ID {track_id}'
-                    
-                    cv2.rectangle(vis, (int(x1), int(y1)), (int(x2), int(y2)), color, thickness)
-                    # Draw ID label
-                    cv2.putText(vis, label, (int(x1), int(y1) - 5),
-                              cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
-
-            # Draw optimal framing box (to keep both fencers in view) with smoothing
-            raw_frame_box = track_info.get('frame_box')
-            frame_box = self.bout_manager.smooth_frame_box(raw_frame_box)
-            
-            if frame_box:
-                x1, y1, x2, y2 = frame_box
-                cv2.rectangle(vis, (int(x1), int(y1)), (int(x2), int(y2)), (255, 255, 0), 2)  # Cyan
+                # Color and style based on fencer ID
+                if track_id == 1:
+                    # Fencer 1 - BLUE
+                    color = (255, 0, 0)  # BGR: Blue
+                    thickness = 3
+                    label = 'Fencer 1'
+                elif track_id == 2:
+                    # Fencer 2 - ORANGE
+                    color = (0, 165, 255)  # BGR: Orange
+                    thickness = 3
+                    label = 'Fencer 2'
+                elif track_id >= 100:
+                    # Other detections - YELLOW (provisional, not locked)
+                    color = (0, 255, 255)  # BGR: Yellow
+                    thickness = 1
+                    label = f'Other'
+                else:
+                    # Fallback
+                    color = (200, 200, 200)  # Gray
+                    thickness = 1
+                    label = f'ID {track_id}'
+                
+                cv2.rectangle(frame, (int(x1), int(y1)), (int(x2), int(y2)), color, thickness)
+                # Draw ID label
+                cv2.putText(frame, label, (int(x1), int(y1) - 5),
+                          cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+
+        # Draw optimal framing box
+        if frame_box:
+            x1, y1, x2, y2 = frame_box
+            cv2.rectangle(frame, (int(x1), int(y1)), (int(x2), int(y2)), (255, 255, 0), 2)  # Cyan
+
+        # Draw tracking status on screen
+        status = track_info.get('status', 'Tracking...')
+        cv2.putText(frame, status, (10, 80), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 255, 255), 2)
+
+    def _put(self, q, item):
+        """Blocking put that gives up once the pipeline is stopping."""
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _get(self, q):
+        """Blocking get that returns None once the pipeline is stopping."""
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        return None
+
+    def _read_loop(self, q_free, q_read):
+        """Reader stage: decode frames into free ring buffers."""
+        try:
+            while True:
+                idx = self._get(q_free)
+                if idx is None:
+                    break
+                if not self.source.read_into(self._frame_bufs[idx]):
+                    break
+                if not self._put(q_read, idx):
+                    break
+        except Exception as e:
+            self._stage_error = e
+        finally:
+            self._put(q_read, None)
 
-            # Draw tracking status on screen
-            status = track_info.get('status', 'Tracking...')
-            cv2.putText(vis, status, (10, 80), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 255, 255), 2)
+    def _detect_loop(self, q_read, q_det):
+        """Detection stage thread: analyse frames in decode order."""
+        try:
+            while True:
+                idx = self._get(q_read)
+                if idx is None:
+                    break
+                result = self._analyse(self._frame_bufs[idx])
+                if not self._put(q_det, (idx, result)):
+                    break
+        except Exception as e:
+            self._stage_error = e
+        finally:
+            self._put(q_det, None)
 
-            self.encoder.encode(vis)
+    def run(self):
+        # read -> detect/track -> draw/encode run concurrently, so throughput
+        # is bounded by the slowest stage instead of the sum of all stages.
+        # Frames move between stages as indices into a ring of buffers.
+        ret, first = self.source.read()
+        if not ret:
+            self.cleanup()
+            return
+
+        # Enough buffers for both queues to be full while every stage holds one
+        n_bufs = 2 * QUEUE_SIZE + 3
+        self._frame_bufs = [first] + [np.empty_like(first) for _ in range(n_bufs - 1)]
+        q_free = queue.Queue()
+        q_read = queue.Queue(maxsize=QUEUE_SIZE)
+        q_det = queue.Queue(maxsize=QUEUE_SIZE)
+        for idx in range(1, n_bufs):
+            q_free.put(idx)
+        q_read.put(0)
+
+        self._stop.clear()
+        self._stage_error = None
+        threads = [
+            threading.Thread(target=self._read_loop, args=(q_free, q_read), name="pipeline-read", daemon=True),
+            threading.Thread(target=self._detect_loop, args=(q_read, q_det), name="pipeline-detect", daemon=True),
+        ]
+        for t in threads:
+            t.start()
+
+        try:
+            while True:
+                item = self._get(q_det)
+                if item is None:
+                    break
+                idx, result = item
+                frame = self._frame_bufs[idx]
+                self._draw_overlays(frame, *result)
+                self.encoder.encode(frame)
+                # Buffer is free again once encoded
+                q_free.put(idx)
+        finally:
+            self._stop.set()
+            for t in threads:
+                t.join()
+            self.cleanup()
 
-        self.cleanup()
+        if self._stage_error is not None:
+            raise self._stage_error
 
     def cleanup(self):
         self.source.release()
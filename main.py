@@ -3,6 +3,7 @@ import os
 from core.pipeline import VisionPipeline
 from sources.video_file import VideoFileSource
 from stream.encoder_software import SoftwareEncoder
+from stream.encoder_passthrough import PassthroughEncoder, is_h264
 from stream.encoder_dummy import DummyEncoder
 from stream import mjpeg_server
 from vision.person_detector import PersonDetector
@@ -30,6 +31,10 @@ FPS = 30
 
 MODE = os.getenv("MODE", "DEV")
 
+# PROD only: republish the H.264 source as-is instead of re-encoding the
+# annotated frames (saves an encode per frame, but the stream has no overlays)
+PASSTHROUGH = os.getenv("PASSTHROUGH", "0") == "1"
+
 
 # -------- DUMMY MODULES (temporaire) --------
 
@@ -43,7 +48,7 @@ def main():
     print(f"Starting pipeline in {MODE} mode")
 
     source = VideoFileSource(VIDEO_PATH)
-    person_detector = PersonDetector(model_name="yolov8n.pt", device="cpu")
+    person_detector = PersonDetector(model_name="yolov8n.pt")
     fencer_detector = FencerDetector(person_detector=person_detector)
     piste_detector = PisteDetector()
     tracker = FencerTracker()  # Smart 2-fencer tracker with auto-initialization
@@ -78,7 +83,12 @@ def main():
             encoder = DummyEncoder(WIDTH, HEIGHT, FPS)
     else:
         # Production: prefer pushing via ffmpeg to external RTSP server
-        encoder = SoftwareEncoder(WIDTH, HEIGHT, FPS)
+        if PASSTHROUGH and is_h264(VIDEO_PATH):
+            encoder = PassthroughEncoder(VIDEO_PATH, loop=source.loop)
+        else:
+            if PASSTHROUGH:
+                print("Source is not H.264, re-encoding instead of passthrough")
+            encoder = SoftwareEncoder(WIDTH, HEIGHT, FPS)
 
     # Create bout manager for state machine (WAITING → INITIALIZING → BOUT_ACTIVE)
     bout_manager = BoutManager()
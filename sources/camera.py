@@ -1,4 +1,5 @@
 import cv2
+import numpy as np
 from core.interfaces import FrameSource
 
 class CameraSource(FrameSource):
@@ -8,5 +9,12 @@ class CameraSource(FrameSource):
     def read(self):
         return self.cap.read()
 
+    def read_into(self, out):
+        # VideoCapture decodes straight into `out` when shape/dtype match
+        ret, frame = self.cap.read(out)
+        if ret and frame is not out:
+            np.copyto(out, frame)
+        return ret
+
     def release(self):
         self.cap.release()
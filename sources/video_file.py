@@ -1,23 +1,131 @@
+import os
 import cv2
+import queue
+import threading
+import numpy as np
 from core.interfaces import FrameSource
 
+# FFmpeg demuxer options for live sources: no input buffering, no reordering delay
+LOW_LATENCY_CAPTURE_OPTIONS = "fflags;nobuffer|flags;low_delay|rtsp_transport;tcp"
+OPEN_TIMEOUT_MS = 5000
+
+
 class VideoFileSource(FrameSource):
-    def __init__(self, path: str, loop: bool = True):
+    def __init__(self, path: str, loop: bool = True, threaded: bool = False, queue_size: int = 16,
+                 low_latency: bool = None):
+        """
+        Args:
+            path: Video file to read
+            loop: Restart from the beginning when the video ends
+            threaded: Decode in a background thread into a bounded queue, so
+                      decoding overlaps with the caller's processing
+            queue_size: Max decoded frames buffered ahead when threaded
+                        (~2.7 MB each at 1280x720)
+            low_latency: Minimal demuxer/decoder buffering for live network
+                         streams (None = on for URLs such as rtsp://). Not for
+                         files: FFmpeg's nobuffer flag breaks their decoding.
+        """
         self.path = path
         self.loop = loop
-        self.cap = cv2.VideoCapture(path)
+        self.low_latency = "://" in path if low_latency is None else low_latency
+        self.cap = self._open()
         self.frame_count = 0
 
+        self._queue = queue.Queue(maxsize=queue_size) if threaded else None
+        self._thread = None
+        self._stopped = threading.Event()
+        self._reader_error = None  # exception that stopped the reader thread
+
+    def _open(self):
+        # Hardware decode (NVDEC/VAAPI...) when the OpenCV build supports it,
+        # silently software otherwise
+        params = [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+        if not self.low_latency:
+            return cv2.VideoCapture(self.path, cv2.CAP_FFMPEG, params)
+
+        params += [cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, OPEN_TIMEOUT_MS]
+        # The FFmpeg backend only reads its options from the environment
+        previous = os.environ.get("OPENCV_FFMPEG_CAPTURE_OPTIONS")
+        os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"] = LOW_LATENCY_CAPTURE_OPTIONS
+        try:
+            cap = cv2.VideoCapture(self.path, cv2.CAP_FFMPEG, params)
+        finally:
+            if previous is None:
+                del os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"]
+            else:
+                os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"] = previous
+        # Keep only the latest frame (not supported by every backend)
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        return cap
+
     def read(self):
-        ret, frame = self.cap.read()
+        if self._queue is None:
+            return self._read(None)
+
+        # Started on first read so callers can query self.cap before that
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._reader, name="video-file-reader", daemon=True)
+            self._thread.start()
+        frame = self._queue.get()
+        if frame is None:
+            # Keep the end-of-video sentinel for subsequent reads
+            self._queue.put(None)
+            if self._reader_error is not None:
+                raise self._reader_error
+            return False, None
+        return True, frame
+
+    def read_into(self, out):
+        if self._queue is not None:
+            return super().read_into(out)
+
+        # VideoCapture decodes straight into `out` when shape/dtype match
+        ret, frame = self._read(out)
+        if ret and frame is not out:
+            np.copyto(out, frame)
+        return ret
+
+    def _read(self, out):
+        ret, frame = self.cap.read(out)
         if not ret and self.loop:
             # Video ended, restart from beginning
             self.cap.release()
-            self.cap = cv2.VideoCapture(self.path)
+            self.cap = self._open()
             self.frame_count = 0
-            ret, frame = self.cap.read()
+            ret, frame = self.cap.read(out)
         self.frame_count += 1
         return ret, frame
 
+    def _reader(self):
+        """Decode frames into the queue until the video ends or release() is called."""
+        try:
+            while not self._stopped.is_set():
+                ret, frame = self._read(None)
+                if not ret or not self._put(frame):
+                    break
+        except Exception as e:
+            # Re-raised by read() (e.g. cv2.error on a corrupt or dropped stream)
+            self._reader_error = e
+        finally:
+            # Always end with the sentinel so read() never waits forever
+            self._put(None)
+
+    def _put(self, item) -> bool:
+        # Blocks while the queue is full (backpressure) but gives up on release()
+        while not self._stopped.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
     def release(self):
+        if self._thread is not None:
+            self._stopped.set()
+            self._thread.join()
+            self._thread = None
+            # Drop buffered frames
+            while not self._queue.empty():
+                self._queue.get_nowait()
         self.cap.release()
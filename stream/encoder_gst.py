@@ -1,12 +1,44 @@
+import threading
 import numpy as np
 from core.interfaces import Encoder
 
 try:
-    from .rtsp_gst_server import push_frame
+    from .rtsp_gst_server import push_frame, is_streaming
 except Exception:
     def push_frame(frame):
         return False
 
+    def is_streaming():
+        return False
+
+
+class LatestSlot:
+    """Single-slot channel: put() replaces any frame not yet taken (latest wins)."""
+
+    def __init__(self):
+        self._item = None
+        self._seq = 0
+        self._cv = threading.Condition()
+
+    def put(self, item):
+        with self._cv:
+            self._item = item
+            self._seq += 1
+            self._cv.notify_all()
+
+    def get(self, last_seq: int, timeout: float = None):
+        """
+        Wait for an item newer than last_seq.
+
+        Returns:
+            (item, seq), or (None, last_seq) on timeout
+        """
+        with self._cv:
+            if not self._cv.wait_for(lambda: self._seq != last_seq, timeout=timeout):
+                return None, last_seq
+            item, self._item = self._item, None
+            return item, self._seq
+
 
 class GstEncoder(Encoder):
     """Encoder that pushes frames to a local GStreamer RTSP server."""
@@ -17,15 +49,39 @@ class GstEncoder(Encoder):
         self.fps = fps
         self.frame_count = 0
 
+        # push_frame blocks while GStreamer encodes, so it runs on its own
+        # thread; frames it is too slow for are replaced, never queued
+        self._slot = LatestSlot()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._push_loop, name="gst-push", daemon=True)
+        self._thread.start()
+
     def encode(self, frame: np.ndarray):
         self.frame_count += 1
-        try:
-            ok = push_frame(frame)
-            if not ok and self.frame_count % 60 == 0:
-                print("[GstEncoder] push_frame failed (server missing?)")
-        except Exception:
+        if not is_streaming():
             if self.frame_count % 60 == 0:
-                print("[GstEncoder] exception pushing frame")
+                print("[GstEncoder] push_frame failed (server missing?)")
+            return
+        # Copy now: the pipeline reuses the frame buffer once encode() returns
+        self._slot.put(frame.tobytes())
+
+    def _push_loop(self):
+        seq = 0
+        pushed = 0
+        while not self._stop.is_set():
+            data, seq = self._slot.get(seq, timeout=0.5)
+            if data is None:
+                continue
+            pushed += 1
+            try:
+                ok = push_frame(data)
+                if not ok and pushed % 60 == 0:
+                    print("[GstEncoder] push_frame failed (server missing?)")
+            except Exception:
+                if pushed % 60 == 0:
+                    print("[GstEncoder] exception pushing frame")
 
     def close(self):
+        self._stop.set()
+        self._thread.join()
         print(f"[GstEncoder] Pipeline finished - Total frames processed: {self.frame_count}")
@@ -0,0 +1,73 @@
+import subprocess
+import cv2
+import numpy as np
+from core.interfaces import Encoder
+
+# Codecs the RTSP output can carry without re-encoding (OpenCV FOURCC names)
+H264_FOURCCS = {"h264", "avc1", "x264"}
+
+
+def is_h264(path: str) -> bool:
+    """True if the video file or stream at path is already H.264."""
+    cap = cv2.VideoCapture(path)
+    try:
+        fourcc = int(cap.get(cv2.CAP_PROP_FOURCC)) & 0xFFFFFFFF  # -1 if unopened
+    finally:
+        cap.release()
+    return fourcc.to_bytes(4, "little").decode("ascii", "replace").lower() in H264_FOURCCS
+
+
+class PassthroughEncoder(Encoder):
+    """
+    Republish an already H.264-encoded source over RTSP without re-encoding.
+
+    ffmpeg reads the source itself and copies the H.264 stream (-c:v copy), so
+    the pipeline's decoded frames are only used for analysis: encode() is a
+    no-op and the RTSP output does not carry the pipeline overlays.
+    """
+
+    def __init__(self, input_url, output_url="rtsp://localhost:8554/live", loop=False):
+        """
+        Args:
+            input_url: H.264 video file or RTSP camera URL
+            output_url: RTSP URL to publish to
+            loop: Restart a video file when it ends (like VideoFileSource)
+        """
+        is_stream = "://" in input_url
+        input_args = []
+        if not is_stream:
+            # Read files at their native frame rate, as a live source would arrive
+            input_args += ["-re"]
+            if loop:
+                input_args += ["-stream_loop", "-1"]
+        else:
+            # No input buffering for live streams only: it breaks file demuxing
+            input_args += ["-fflags", "nobuffer", "-rtsp_transport", "tcp"]
+        print(f"[PassthroughEncoder] Copying H.264 from {input_url} to {output_url}")
+
+        self.process = subprocess.Popen(
+            [
+                "ffmpeg",
+                "-y",
+                *input_args,
+                "-i", input_url,
+                "-an",
+                "-c:v", "copy",
+                "-f", "rtsp",
+                "-rtsp_transport", "tcp",
+                output_url
+            ],
+            stdin=subprocess.DEVNULL
+        )
+
+    def encode(self, frame: np.ndarray):
+        # ffmpeg forwards the source stream directly
+        pass
+
+    def close(self):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
@@ -1,30 +1,88 @@
+import os
+import platform
 import subprocess
 import numpy as np
 from core.interfaces import Encoder
 
+
+def _ffmpeg_encoders() -> set:
+    """Names of the video encoders the local ffmpeg build provides."""
+    try:
+        out = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-encoders"],
+            capture_output=True, text=True, timeout=10
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return set()
+    names = set()
+    for line in out.splitlines():
+        parts = line.split()
+        # Encoder lines look like " V....D libx264   description"
+        if len(parts) >= 2 and len(parts[0]) == 6 and parts[0][0] == 'V':
+            names.add(parts[1])
+    return names
+
+
+def select_codec_args() -> list:
+    """
+    Pick the H.264 encoder arguments for this machine.
+
+    Prefers the hardware encoder (Jetson nvmpi, NVIDIA NVENC, V4L2 M2M) so the
+    CPU stays free for vision work, and falls back to libx264.
+    """
+    encoders = _ffmpeg_encoders()
+    is_arm = platform.machine().lower().startswith('aarch')
+
+    if is_arm and os.path.exists('/dev/nvhost-msenc') and 'h264_nvmpi' in encoders:
+        # Jetson hardware encoder
+        return ["-c:v", "h264_nvmpi", "-preset", "ll", "-b:v", "4M"]
+    if not is_arm and os.path.exists('/dev/nvidia0') and 'h264_nvenc' in encoders:
+        # Desktop NVIDIA GPU
+        return ["-c:v", "h264_nvenc", "-preset", "p1", "-tune", "ll", "-zerolatency", "1"]
+    if is_arm and 'h264_v4l2m2m' in encoders:
+        # Other ARM boards with a V4L2 memory-to-memory encoder
+        return ["-c:v", "h264_v4l2m2m", "-b:v", "4M"]
+    return ["-c:v", "libx264", "-preset", "ultrafast", "-tune", "zerolatency"]
+
+
 class SoftwareEncoder(Encoder):
-    def __init__(self, width, height, fps):
+    """Pipe raw BGR frames to ffmpeg, which encodes and publishes them over RTSP."""
+
+    def __init__(self, width, height, fps, codec_args=None):
+        """
+        Args:
+            codec_args: ffmpeg output codec arguments (default: select_codec_args())
+        """
+        if codec_args is None:
+            codec_args = select_codec_args()
+        print(f"[SoftwareEncoder] Encoding with {' '.join(codec_args)}")
+
         self.process = subprocess.Popen(
             [
                 "ffmpeg",
                 "-y",
+                "-thread_queue_size", "1024",
+                "-fflags", "nobuffer",
                 "-f", "rawvideo",
                 "-vcodec","rawvideo",
                 "-pix_fmt","bgr24",
                 "-s", f"{width}x{height}",
                 "-r", str(fps),
                 "-i","-",
-                "-c:v","libx264",
-                "-preset","veryfast",
+                *codec_args,
+                "-flags", "low_delay",
                     "-f","rtsp",
                     "-rtsp_transport","tcp",
                     "rtsp://localhost:8554/live"
             ],
-            stdin=subprocess.PIPE
+            stdin=subprocess.PIPE,
+            bufsize=1 << 20  # fewer syscalls for ~2.7 MB frames
         )
 
     def encode(self, frame: np.ndarray):
-        self.process.stdin.write(frame.tobytes())
+        # Write the array's own buffer instead of a tobytes() copy
+        # (ascontiguousarray is a no-op for OpenCV frames)
+        self.process.stdin.write(memoryview(np.ascontiguousarray(frame)))
 
     def close(self):
         self.process.stdin.close()
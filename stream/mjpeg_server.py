@@ -1,5 +1,4 @@
 import threading
-import time
 import io
 import cv2
 import numpy as np
@@ -7,38 +6,121 @@ from fastapi import FastAPI
 from fastapi.responses import StreamingResponse, Response
 import uvicorn
 
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR, TJSAMP_420
+    _tj = TurboJPEG()
+except Exception:
+    # PyTurboJPEG or libturbojpeg missing: fall back to OpenCV's encoder
+    _tj = None
+
+# Same as cv2.imencode's default, so both encoders give the same picture quality
+JPEG_QUALITY = 95
+
+# Preview frames wider than this are downscaled before encoding (the web UI
+# shows the preview small and maps ROI clicks to the full 1280x720 frame)
+PREVIEW_MAX_W = 640
+
 app = FastAPI()
 
-# Global latest frame storage
-_latest_frame = None
-_frame_lock = threading.Lock()
+# Latest frame storage. The producer copies raw frames into one of two
+# reused buffers and clients JPEG-encode lazily, at most once per frame, so
+# nothing is encoded or allocated per frame while nobody is watching.
+# _frame_seq counts published frames and _frame_cv wakes streaming clients.
+_raw_bufs = [None, None]
+_raw_idx = 0  # buffer holding the latest frame
+_encoding = [0, 0]  # clients currently encoding from each buffer
+_jpeg_cache = (0, None)  # (frame seq, JPEG bytes) of the last encoded frame
+_frame_seq = 0
+_frame_cv = threading.Condition()
+
+
+def _encode_jpeg(img):
+    """Encode a BGR image as JPEG bytes (libjpeg-turbo when available), None on failure."""
+    if _tj is not None:
+        return _tj.encode(img, quality=JPEG_QUALITY, pixel_format=TJPF_BGR, jpeg_subsample=TJSAMP_420)
+    ret, jpeg = cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
+    return jpeg.tobytes() if ret else None
+
+
+# Tiny placeholder image sent until the first frame arrives
+_PLACEHOLDER_JPEG = _encode_jpeg(255 * np.ones((10, 10, 3), dtype='uint8'))
+
+# Multipart part header template, formatted with the JPEG length
+_PART_HEADER = b"\r\n--frame\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n"
 
 
 def update_frame(frame):
-    """Encode frame as JPEG and store as latest frame."""
-    global _latest_frame
-    ret, jpeg = cv2.imencode('.jpg', frame)
-    if not ret:
-        return
-    with _frame_lock:
-        _latest_frame = jpeg.tobytes()
+    """Store frame as latest frame (downscaled, JPEG-encoded on demand by clients)."""
+    global _raw_idx, _frame_seq
+    with _frame_cv:
+        target = 1 - _raw_idx
+        if _encoding[target]:
+            # A slow client is still encoding the previous frame from this
+            # buffer: drop this frame from the preview rather than block
+            return
+        buf = _raw_bufs[target]
+
+    h, w = frame.shape[:2]
+    if w > PREVIEW_MAX_W:
+        size = (PREVIEW_MAX_W, max(1, round(h * PREVIEW_MAX_W / w)))
+    else:
+        size = (w, h)
+    shape = (size[1], size[0]) + frame.shape[2:]
+
+    # Clients only read _raw_bufs[_raw_idx], so the other one is ours to fill
+    if buf is None or buf.shape != shape or buf.dtype != frame.dtype:
+        buf = np.empty(shape, dtype=frame.dtype)
+    if size == (w, h):
+        np.copyto(buf, frame)
+    else:
+        cv2.resize(frame, size, dst=buf, interpolation=cv2.INTER_AREA)
+
+    with _frame_cv:
+        _raw_bufs[target] = buf
+        _raw_idx = target
+        _frame_seq += 1
+        _frame_cv.notify_all()
+
+
+def _latest_jpeg():
+    """JPEG bytes of the latest frame (placeholder if none yet), encoded once per frame."""
+    global _jpeg_cache
+    with _frame_cv:
+        seq = _frame_seq
+        if _jpeg_cache[0] == seq and _jpeg_cache[1] is not None:
+            return _jpeg_cache[1]
+        idx = _raw_idx
+        buf = _raw_bufs[idx]
+        if buf is None:
+            return _PLACEHOLDER_JPEG
+        _encoding[idx] += 1
+
+    try:
+        jpeg = _encode_jpeg(buf)
+    finally:
+        with _frame_cv:
+            _encoding[idx] -= 1
+
+    if jpeg is None:
+        return _PLACEHOLDER_JPEG
+    with _frame_cv:
+        if seq > _jpeg_cache[0]:
+            _jpeg_cache = (seq, jpeg)
+    return jpeg
 
 
 def frame_generator():
-    boundary = b'--frame'
+    last_seq = -1
     while True:
-        with _frame_lock:
-            frame = _latest_frame
-        if frame is None:
-            # send a tiny placeholder image
-            img = 255 * np.ones((10, 10, 3), dtype='uint8')
-            ret, jpg = cv2.imencode('.jpg', img)
-            frame = jpg.tobytes()
-        yield (b"\r\n" + boundary + b"\r\n"
-               + b"Content-Type: image/jpeg\r\n"
-               + b"Content-Length: " + str(len(frame)).encode() + b"\r\n\r\n"
-               + frame)
-        time.sleep(1 / 15)
+        with _frame_cv:
+            # Sleep until a new frame is published; the timeout re-sends the
+            # current one so idle connections stay alive
+            _frame_cv.wait_for(lambda: _frame_seq != last_seq, timeout=1.0)
+            last_seq = _frame_seq
+        frame = _latest_jpeg()
+        # Header and JPEG as separate chunks, so the JPEG bytes are not copied
+        yield _PART_HEADER % len(frame)
+        yield frame
 
 
 @app.get('/preview')
@@ -49,13 +131,7 @@ def preview():
 @app.get('/snapshot')
 def snapshot():
     """Return a single JPEG frame (not a stream)"""
-    with _frame_lock:
-        frame = _latest_frame
-    if frame is None:
-        # send a tiny placeholder image
-        img = 255 * np.ones((10, 10, 3), dtype='uint8')
-        ret, jpg = cv2.imencode('.jpg', img)
-        frame = jpg.tobytes()
+    frame = _latest_jpeg()
     return Response(content=frame, media_type='image/jpeg')
 
 
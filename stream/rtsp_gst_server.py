@@ -1,6 +1,6 @@
 """Simple RTSP server using GStreamer's GstRtspServer.
 
-This module exposes `start_server()` and `push_frame(frame)`.
+This module exposes `start_server()`, `is_streaming()` and `push_frame(frame)`.
 
 Requirements (system):
 - GStreamer and gst-rtsp-server (libgstrtspserver-1.0)
@@ -18,6 +18,9 @@ _Gst = None
 _GObject = None
 _GstRtspServer = None
 _appsrc = None
+_pool = None  # Gst.BufferPool of frame-sized buffers for _appsrc
+_frame_duration = 0  # ns per frame at the configured fps (set in do_configure)
+_next_pts = 0  # timestamp of the next pushed buffer, ns
 _loop = None
 
 
@@ -81,9 +84,15 @@ class SensorFactory:
                 return _Gst.parse_launch(launch)
 
             def do_configure(self, rtsp_media):
-                global _appsrc
+                global _appsrc, _pool, _frame_duration, _next_pts
                 pipeline = rtsp_media.get_pipeline()
                 appsrc = pipeline.get_by_name('mysrc')
+                pool = _make_pool(appsrc.get_property('caps'), self.width * self.height * 3)
+                if _pool is not None:
+                    _pool.set_active(False)
+                _pool = pool
+                _frame_duration = _Gst.util_uint64_scale_int(1, _Gst.SECOND, self.fps)
+                _next_pts = 0
                 _appsrc = appsrc
 
         self._factory = _Factory(width, height, fps, use_hw)
@@ -95,6 +104,16 @@ class SensorFactory:
         return self._factory
 
 
+def _make_pool(caps, frame_size, min_buffers=4, max_buffers=16):
+    """Buffer pool recycling frame-sized buffers once downstream releases them."""
+    pool = _Gst.BufferPool.new()
+    config = pool.get_config()
+    _Gst.BufferPool.config_set_params(config, caps, frame_size, min_buffers, max_buffers)
+    pool.set_config(config)
+    pool.set_active(True)
+    return pool
+
+
 def _main_loop(port=8554, width=1280, height=720, fps=30, use_hw=False):
     global _loop
     _ensure_gi()
@@ -133,28 +152,43 @@ def start_server(background=True, port=8554, width=1280, height=720, fps=30, use
         _main_loop(port, width, height, fps, use_hw)
 
 
+def is_streaming():
+    """True once a client has connected and the appsrc accepts frames."""
+    return _appsrc is not None
+
+
 def push_frame(frame):
-    """Push a numpy BGR frame into the appsrc as Gst.Buffer.
+    """Push a numpy BGR frame (or its raw bytes) into the appsrc as Gst.Buffer.
 
     Returns True on success, False otherwise.
     """
-    global _appsrc
+    global _next_pts
     if _appsrc is None:
         return False
 
     try:
-        import numpy as np
-
         if not _gi_available or _Gst is None:
             return False
 
-        h, w = frame.shape[:2]
-        data = frame.tobytes()
-        buf = _Gst.Buffer.new_allocate(None, len(data), None)
+        # The pipeline reuses frame buffers as soon as encode() returns while
+        # GStreamer encodes asynchronously, so the data must be copied here
+        # (a zero-copy new_wrapped_full() buffer would be overwritten).
+        # GstEncoder already passes its own bytes copy.
+        data = frame if isinstance(frame, bytes) else frame.tobytes()
+        buf = None
+        pool = _pool
+        if pool is not None:
+            # Reuse a pooled buffer (returned to the pool when the encoder is done)
+            ret, buf = pool.acquire_buffer(None)
+            if ret != _Gst.FlowReturn.OK or buf.get_size() != len(data):
+                buf = None
+        if buf is None:
+            buf = _Gst.Buffer.new_allocate(None, len(data), None)
         buf.fill(0, data)
-        # timestamping (optional)
-        duration = _Gst.util_uint64_scale_int(1, _Gst.SECOND, 30)
-        buf.duration = duration
+        # Consecutive timestamps so RTP timing stays regular under load
+        buf.pts = _next_pts
+        buf.duration = _frame_duration
+        _next_pts += _frame_duration
         _appsrc.emit('push-buffer', buf)
         return True
     except Exception:
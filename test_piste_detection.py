@@ -1,79 +1,129 @@
 #!/usr/bin/env python3
 """Quick test script to visualize piste detection on video frames."""
 
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import cv2
 import numpy as np
 from vision.piste_detector import PisteDetector
 from vision.person_detector import PersonDetector
 from sources.video_file import VideoFileSource
 
-def main():
-    VIDEO_PATH = "data/test.mp4"
+VIDEO_PATH = "data/test.mp4"
+MAX_FRAMES = 30  # test on first 30 frames
+
+# Frames are independent, so they are analysed in parallel worker processes
+MAX_WORKERS = min(4, os.cpu_count() or 1)
+
+# Per-process detectors, created once by _init_worker (YOLO loads once per worker)
+_piste_detector = None
+_person_detector = None
+
+
+def _init_worker():
+    global _piste_detector, _person_detector
+    # One OpenCV thread per worker process to avoid oversubscription
+    if MAX_WORKERS > 1:
+        cv2.setNumThreads(1)
+    _piste_detector = PisteDetector()
+    _person_detector = PersonDetector(model_name="yolov8n.pt")
+
+
+def process_frame(frame_count, frame):
+    """
+    Detect, annotate and (for sample frames) save one frame.
+
+    Returns:
+        (frame_count, info, saved file or None)
+    """
+    # Detect pistes (list of (x1, y1, x2, y2) regions)
+    piste_bboxes = _piste_detector.detect(frame)
     
-    source = VideoFileSource(VIDEO_PATH)
-    piste_detector = PisteDetector()
-    person_detector = PersonDetector(model_name="yolov8n.pt", device="cpu")
+    # Detect persons
+    detections = _person_detector.detect(frame)
     
-    frame_count = 0
-    max_frames = 30  # test on first 30 frames
+    # Filter detections to those centered within a piste (if detected)
+    filtered_detections = []
+    if piste_bboxes and detections:
+        with_bbox = [d for d in detections if d.get('bbox')]
+        if with_bbox:
+            bboxes = np.asarray([d['bbox'] for d in with_bbox], dtype=np.float32)
+            pistes = np.asarray(piste_bboxes, dtype=np.float32)
+            cx = ((bboxes[:, 0] + bboxes[:, 2]) * 0.5)[:, None]
+            cy = ((bboxes[:, 1] + bboxes[:, 3]) * 0.5)[:, None]
+            # (detections x pistes) containment, any piste will do
+            inside = ((cx >= pistes[:, 0]) & (cx <= pistes[:, 2])
+                      & (cy >= pistes[:, 1]) & (cy <= pistes[:, 3])).any(axis=1)
+            filtered_detections = [with_bbox[i] for i in np.flatnonzero(inside)]
+    else:
+        filtered_detections = detections or []
+    
+    # Draw directly on the decoded frame: it is not reused after this call
+    # Draw pistes (blue)
+    for x1, y1, x2, y2 in piste_bboxes:
+        cv2.rectangle(frame, (int(x1), int(y1)), (int(x2), int(y2)), (255, 0, 0), 3)
+        cv2.putText(frame, 'Piste', (int(x1), int(y1) - 5), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 0, 0), 2)
+    
+    # Draw detected fencers (yellow)
+    for d in filtered_detections:
+        bbox = d.get('bbox')
+        score = d.get('score', 0)
+        if bbox:
+            x1, y1, x2, y2 = bbox
+            cv2.rectangle(frame, (int(x1), int(y1)), (int(x2), int(y2)), (0, 255, 255), 2)
+            cv2.putText(frame, f'Fencer {score:.2f}', (int(x1), int(y1) - 5), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
     
-    while frame_count < max_frames:
+    # Add frame info
+    info = f"Frame {frame_count}: piste={'YES' if piste_bboxes else 'NO'}, fencers={len(filtered_detections)}"
+    cv2.putText(frame, info, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+    
+    # Save sample frames (every 10 frames) instead of displaying
+    outfile = None
+    if frame_count % 10 == 0 or piste_bboxes:
+        outfile = f"/tmp/piste_test_frame_{frame_count:04d}.png"
+        cv2.imwrite(outfile, frame)
+    return frame_count, info, outfile
+
+
+def main():
+    source = VideoFileSource(VIDEO_PATH)
+
+    # Decode sequentially here while the workers analyse frames
+    # (on a single core the pool would only add pickling overhead)
+    pool = None
+    if MAX_WORKERS > 1:
+        # Spawned, not forked: workers start on the first submit(), once
+        # source.read() has FFmpeg decode threads running in this process
+        pool = ProcessPoolExecutor(max_workers=MAX_WORKERS, initializer=_init_worker,
+                                   mp_context=multiprocessing.get_context("spawn"))
+    else:
+        _init_worker()
+
+    results = []
+    frame_count = 0
+    while frame_count < MAX_FRAMES:
         ret, frame = source.read()
         if not ret:
             break
         
         frame_count += 1
-        
-        # Detect piste
-        piste_bbox = piste_detector.detect(frame)
-        
-        # Detect persons
-        detections = person_detector.detect(frame)
-        
-        # Filter detections to within piste (if detected)
-        filtered_detections = []
-        if piste_bbox and detections:
-            px1, py1, px2, py2 = piste_bbox
-            for d in detections:
-                bbox = d.get('bbox')
-                if bbox:
-                    x1, y1, x2, y2 = bbox
-                    cx = (x1 + x2) / 2.0
-                    cy = (y1 + y2) / 2.0
-                    if px1 <= cx <= px2 and py1 <= cy <= py2:
-                        filtered_detections.append(d)
+        if pool is not None:
+            results.append(pool.submit(process_frame, frame_count, frame))
         else:
-            filtered_detections = detections or []
-        
-        # Draw on frame
-        vis = frame.copy()
-        
-        # Draw piste (blue)
-        if piste_bbox:
-            x1, y1, x2, y2 = piste_bbox
-            cv2.rectangle(vis, (int(x1), int(y1)), (int(x2), int(y2)), (255, 0, 0), 3)
-            cv2.putText(vis, 'Piste', (int(x1), int(y1) - 5), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 0, 0), 2)
-        
-        # Draw detected fencers (yellow)
-        for d in filtered_detections:
-            bbox = d.get('bbox')
-            score = d.get('score', 0)
-            if bbox:
-                x1, y1, x2, y2 = bbox
-                cv2.rectangle(vis, (int(x1), int(y1)), (int(x2), int(y2)), (0, 255, 255), 2)
-                cv2.putText(vis, f'Fencer {score:.2f}', (int(x1), int(y1) - 5), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
-        
-        # Add frame info
-        info = f"Frame {frame_count}: piste={'YES' if piste_bbox else 'NO'}, fencers={len(filtered_detections)}"
-        cv2.putText(vis, info, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-        
-        # Save sample frames (every 10 frames) instead of displaying
-        if frame_count % 10 == 0 or piste_bbox:
-            outfile = f"/tmp/piste_test_frame_{frame_count:04d}.png"
-            cv2.imwrite(outfile, vis)
-            print(f"Saved {outfile}: {info}")
+            results.append(process_frame(frame_count, frame))
     
     source.release()
+
+    # Report in frame order
+    for result in results:
+        _, info, outfile = result.result() if pool is not None else result
+        if outfile is not None:
+            print(f"Saved {outfile}: {info}")
+    if pool is not None:
+        pool.shutdown()
+
     cv2.destroyAllWindows()
     print(f"Test complete. Processed {frame_count} frames.")
 
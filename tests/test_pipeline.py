@@ -1,5 +1,12 @@
+import threading
+
 import numpy as np
+import pytest
 
+from core import pipeline as pipeline_module
+from core.pipeline import VisionPipeline
+from core.interfaces import FrameSource
+from vision.bout_manager import BoutManager
 from vision.tracker import CentroidTracker
 
 
@@ -42,3 +49,118 @@ def test_tracker_new_object_registration():
 	ids = [t["id"] for t in tracks2]
 	assert first_id in ids
 	assert len(tracks2) == 2
+
+
+def test_tracker_optimal_matching_keeps_both_tracks():
+	pytest.importorskip("scipy")
+	tracker = CentroidTracker(max_disappeared=5, max_distance=50)
+	tracks1 = tracker.update([
+		{"bbox": (-10, -10, 10, 10), "score": 0.9},  # centroid (0, 0)
+		{"bbox": (20, -10, 40, 10), "score": 0.9},  # centroid (30, 0)
+	])
+	ids1 = {t["centroid"][0]: t["id"] for t in tracks1}
+
+	# Both tracks are nearest to x=25; greedy matching gives it to the
+	# right track and registers x=60 as a new object
+	tracks2 = tracker.update([
+		{"bbox": (15, -10, 35, 10), "score": 0.9},  # centroid (25, 0)
+		{"bbox": (50, -10, 70, 10), "score": 0.9},  # centroid (60, 0)
+	])
+	ids2 = {t["centroid"][0]: t["id"] for t in tracks2}
+	assert len(tracks2) == 2
+	assert ids2 == {25.0: ids1[0.0], 60.0: ids1[30.0]}
+
+
+class _CountingSource(FrameSource):
+	def __init__(self, n):
+		self.n = n
+		self.i = 0
+
+	def read(self):
+		if self.i >= self.n:
+			return False, None
+		self.i += 1
+		return True, np.full((48, 64, 3), self.i, dtype=np.uint8)
+
+	def release(self):
+		pass
+
+
+class _NoPiste:
+	def detect(self, frame):
+		return []
+
+
+class _EchoDetector:
+	def detect(self, frame, apply_roi_filter=True, apply_color_filter=True):
+		# Encode the frame number in the detection so ordering can be checked
+		return [{"bbox": (0, 0, 10, 10), "score": float(frame[0, 0, 0])}]
+
+
+class _EchoTracker:
+	def update(self, detections, guard_line_detector=None):
+		return [], {"status": "ok", "frame_id": int(detections[0]["score"])}
+
+	def validate_fencers_on_guard_lines(self, guard_line_detector, current_detections=None):
+		return {}
+
+
+class _RecordingEncoder:
+	def __init__(self):
+		self.frames = []
+		self.closed = False
+
+	def encode(self, frame):
+		self.frames.append(int(frame[-1, -1, 0]))
+
+	def close(self):
+		self.closed = True
+
+
+def test_pipeline_stages_keep_frame_order(tmp_path, monkeypatch):
+	monkeypatch.setattr(pipeline_module, "STATS_FILE", str(tmp_path / "stats.json"))
+	encoder = _RecordingEncoder()
+	pipeline = VisionPipeline(
+		source=_CountingSource(50),
+		person_detector=_EchoDetector(),
+		piste_detector=_NoPiste(),
+		tracker=_EchoTracker(),
+		bout_manager=BoutManager(),
+		encoder=encoder,
+	)
+	pipeline.run()
+
+	# Every frame is encoded exactly once, in decode order
+	assert encoder.frames == list(range(1, 51))
+	assert encoder.closed
+
+
+class _FailingCapture:
+	def read(self, out=None):
+		raise RuntimeError("stream dropped")
+
+	def release(self):
+		pass
+
+
+def test_threaded_video_source_reraises_reader_error(monkeypatch):
+	from sources import video_file
+
+	monkeypatch.setattr(video_file.VideoFileSource, "_open", lambda self: _FailingCapture())
+	source = video_file.VideoFileSource("missing.mp4", threaded=True)
+	result = {}
+
+	def read():
+		try:
+			source.read()
+		except RuntimeError as e:
+			result["error"] = e
+
+	reader = threading.Thread(target=read, daemon=True)
+	reader.start()
+	reader.join(timeout=3)
+
+	# read() returns (re-raising the reader's error) instead of blocking forever
+	assert not reader.is_alive()
+	assert str(result["error"]) == "stream dropped"
+	source.release()
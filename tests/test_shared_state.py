@@ -0,0 +1,140 @@
+import json
+import os
+
+import pytest
+
+from config import shared_state
+from config.json_store import JsonCache, atomic_write_json
+
+
+def test_json_cache_reloads_only_on_change(tmp_path):
+    path = tmp_path / "state.json"
+    path.write_text(json.dumps({"value": 1}))
+    cache = JsonCache(str(path))
+
+    calls = []
+
+    def parse(data):
+        calls.append(data)
+        return data["value"]
+
+    assert cache.load(parse) == 1
+    assert cache.load(parse) == 1
+    assert len(calls) == 1
+
+    # Rewrite with a different mtime -> re-parsed
+    path.write_text(json.dumps({"value": 22}))
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert cache.load(parse) == 22
+    assert len(calls) == 2
+
+
+def test_json_cache_missing_file(tmp_path):
+    cache = JsonCache(str(tmp_path / "missing.json"))
+    assert cache.load() is None
+
+
+def test_atomic_write_json_replaces_file(tmp_path):
+    path = tmp_path / "state.json"
+    path.write_text("{}")
+    atomic_write_json(str(path), {"value": 3}, indent=2)
+    assert json.loads(path.read_text()) == {"value": 3}
+    # No temporary files are left behind
+    assert [p.name for p in tmp_path.iterdir()] == ["state.json"]
+
+
+def test_shared_state_sections(tmp_path, monkeypatch):
+    from config import shared_guard_lines, shared_roi, shared_visibility
+
+    state_file = str(tmp_path / "shared_state.json")
+    monkeypatch.setattr(shared_state, "STATE_FILE", state_file)
+    monkeypatch.setattr(shared_state, "_cache", JsonCache(state_file))
+
+    assert shared_roi.get_manual_roi() is None
+    assert shared_visibility.get_piste_visible() is True
+    assert shared_guard_lines.get_guard_lines_adjustments() == shared_guard_lines.DEFAULT_STATE
+
+    shared_roi.set_manual_roi(10, 20, 300, 400)
+    shared_visibility.set_piste_visible(False)
+    state = shared_guard_lines.set_guard_line_adjustment('left', offset_x=12)
+    assert state['left_offset'] == 12.0 and state['right_tilt'] == 1.0
+
+    # All sections live in the same file
+    with open(state_file) as f:
+        assert set(json.load(f)) == {"roi", "visibility", "guard_lines"}
+    assert shared_roi.get_manual_roi() == (10, 20, 300, 400)
+    assert shared_visibility.get_piste_visible() is False
+    assert shared_guard_lines.get_guard_lines_adjustments()['left_offset'] == 12.0
+
+    shared_roi.clear_manual_roi()
+    assert shared_roi.get_manual_roi() is None
+    assert shared_visibility.get_piste_visible() is False
+
+
+def test_json_cache_does_not_reparse_corrupt_file(tmp_path, monkeypatch):
+    path = tmp_path / "state.json"
+    path.write_text("{not json")
+    cache = JsonCache(str(path))
+
+    opened = []
+    real_open = open
+    monkeypatch.setattr("builtins.open", lambda *a, **k: opened.append(a[0]) or real_open(*a, **k))
+
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            cache.load()
+    assert len(opened) == 1
+
+
+
+def test_json_cache_concurrent_loads(tmp_path):
+    import sys
+    import threading
+
+    path = tmp_path / "state.json"
+    path.write_text(json.dumps({"value": 1}))
+    cache = JsonCache(str(path))
+    results = []
+    done = threading.Event()
+
+    def reader():
+        for _ in range(20000):
+            results.append(cache.load())
+
+    def invalidator():
+        # Writers invalidate the cache while other threads are reading it
+        while not done.is_set():
+            cache.invalidate()
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=reader) for _ in range(3)]
+        inv = threading.Thread(target=invalidator)
+        inv.start()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        done.set()
+        inv.join()
+        sys.setswitchinterval(interval)
+
+    # A reader must never get a value that does not belong to the file version
+    assert all(r == {"value": 1} for r in results)
+
+
+def test_json_cache_sees_replace_with_same_mtime(tmp_path):
+    path = tmp_path / "state.json"
+    atomic_write_json(str(path), {"offset": 20.0})
+    cache = JsonCache(str(path))
+    assert cache.load() == {"offset": 20.0}
+
+    # Same size and mtime (as within a coarse timestamp granularity), new inode
+    st = os.stat(path)
+    atomic_write_json(str(path), {"offset": 30.0})
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert os.stat(path).st_size == st.st_size
+    assert cache.load() == {"offset": 30.0}
@@ -29,16 +29,36 @@ class FencerDetector:
         self.roi_cache_duration = roi_cache_duration
         self.last_roi_load_time = 0
         self.cached_roi = None
+        # Expanded ROI for the last (ROI, frame size), recomputed when either changes
+        self._expanded_roi_key = None
+        self._expanded_roi = None
         self.min_white_ratio = 0.15  # At least 15% of bbox should be white/gray (for outfit)
         
         # HSV ranges for white and light gray clothing (typical fencer attire)
         # Fencers wear white protective gear (jacket, mask, gloves)
-        self.white_threshold_lower = np.array([0, 0, 150])      # HSV: low saturation, high value
-        self.white_threshold_upper = np.array([180, 50, 255])   # Almost white
+        # (uint8 like the HSV image, so inRange needs no bound conversion)
+        self.white_threshold_lower = np.array([0, 0, 150], dtype=np.uint8)      # HSV: low saturation, high value
+        self.white_threshold_upper = np.array([180, 50, 255], dtype=np.uint8)   # Almost white
 
         # Light gray range (for some fencing gear variants)
-        self.gray_threshold_lower = np.array([0, 0, 100])       # Low saturation, medium value
-        self.gray_threshold_upper = np.array([180, 30, 180])    # Light gray
+        self.gray_threshold_lower = np.array([0, 0, 100], dtype=np.uint8)       # Low saturation, medium value
+        self.gray_threshold_upper = np.array([180, 30, 180], dtype=np.uint8)    # Light gray
+
+        # Color ratio is measured on every Nth pixel of each axis of the bbox
+        # (ratios move by ~0.004 on average at 2, for 4x fewer pixels)
+        self.color_sample_step = 2
+        # Large bboxes (close-up fencers) use a coarser step: on test.mp4 crops
+        # over 40k pixels move by ~0.0035 on average at 4 vs 2, for 4x fewer pixels
+        self.color_sample_step_large = 4
+        self.color_sample_large_pixels = 40000
+
+        # Color ratios of recent detections, keyed by bbox quantized to 8px:
+        # key -> (ratio, frame index computed at, detection score)
+        self._ratio_cache: Dict[Tuple[int, int, int, int], Tuple[float, int, float]] = {}
+        self._frame_idx = 0
+        self.ratio_cache_frames = 5      # Reuse a cached ratio for this many frames
+        self.ratio_cache_max_age = 30    # Evict entries older than this
+        self.ratio_cache_max_score_change = 0.1  # Recompute if YOLO confidence moved more
     
     def detect(self, frame: np.ndarray, apply_roi_filter: bool = True, apply_color_filter: bool = True) -> List[Dict]:
         """
@@ -60,6 +80,7 @@ class FencerDetector:
         """
         if frame is None or frame.size == 0:
             return []
+        self._frame_idx += 1
         
         # Detect all persons using YOLO first
         all_persons = self.person_detector.detect(frame)
@@ -67,31 +88,53 @@ class FencerDetector:
         if not all_persons:
             return []
         
+        # ROI filtering is pure bbox geometry, so run it first: the color
+        # filter then only converts the crops of detections on the piste
+        if apply_roi_filter:
+            all_persons = self._filter_by_roi(all_persons, frame.shape)
+            if not all_persons:
+                return []
+        
         # Apply white/gray color filtering if requested
         if apply_color_filter:
-            hsv_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-            filtered_persons = []
-            for detection in all_persons:
-                white_ratio = self._get_white_ratio(hsv_frame, detection.get('bbox'))
-                # Include both white and light gray fencers
-                gray_ratio = self._get_gray_ratio(hsv_frame, detection.get('bbox'))
-                fencer_ratio = max(white_ratio, gray_ratio)
-                
-                if fencer_ratio >= self.min_white_ratio:
-                    filtered_persons.append(detection)
-                    # Only log if rejected (less spam)
-                else:
-                    pass  # Silently reject (likely referee or spectator)
-            
-            all_persons = filtered_persons
-        
-        if not all_persons:
-            return []
-        
-        # If not filtering by ROI, return all color-filtered detections
-        if not apply_roi_filter:
-            return all_persons
+            all_persons = [
+                detection for detection in all_persons
+                # Silently reject low coverage (likely referee or spectator)
+                if self._get_cached_color_ratio(frame, detection) >= self.min_white_ratio
+            ]
+            self._evict_ratio_cache()
+        
+        return all_persons
+    
+    def _get_cached_color_ratio(self, frame: np.ndarray, detection: Dict) -> float:
+        """
+        Color ratio of a detection, reused from a recent frame when the bbox
+        (to within 8px) and the detection score have not changed.
+        """
+        bbox = detection.get('bbox')
+        if not bbox or len(bbox) < 4:
+            return 0.0
         
+        key = tuple(int(v) >> 3 for v in bbox[:4])
+        score = detection.get('score', 0.0)
+        cached = self._ratio_cache.get(key)
+        if (cached is not None
+                and self._frame_idx - cached[1] < self.ratio_cache_frames
+                and abs(score - cached[2]) <= self.ratio_cache_max_score_change):
+            return cached[0]
+        
+        ratio = self._get_fencer_color_ratio(frame, bbox)
+        self._ratio_cache[key] = (ratio, self._frame_idx, score)
+        return ratio
+    
+    def _evict_ratio_cache(self):
+        """Drop cached ratios older than ratio_cache_max_age frames."""
+        oldest = self._frame_idx - self.ratio_cache_max_age
+        for key in [k for k, (_, idx, _) in self._ratio_cache.items() if idx < oldest]:
+            del self._ratio_cache[key]
+    
+    def _filter_by_roi(self, detections: List[Dict], frame_shape: Tuple) -> List[Dict]:
+        """Keep detections whose feet touch the (slightly expanded) piste ROI."""
         # Load ROI from file only if cache expired (every 10 seconds by default)
         current_time = time.time()
         if (current_time - self.last_roi_load_time) >= self.roi_cache_duration:
@@ -104,26 +147,12 @@ class FencerDetector:
             # No ROI selected - return empty list (only when filtering by ROI)
             return []
         
-        x1_roi, y1_roi, x2_roi, y2_roi = roi
-        
-        # During initialization, we collect all detections without ROI restriction
-        # During tracking (BOUT_ACTIVE), we use the exact ROI with minimal expansion
-        # The ROI is drawn by the user as the exact piste boundaries
-        # Minimal expansion only to account for slight position variation (5% instead of 15%)
-        roi_width = x2_roi - x1_roi
-        roi_height = y2_roi - y1_roi
-        margin_x = int(roi_width * 0.05)  # Reduced from 0.15 to 0.05 for stricter piste adherence
-        margin_y = int(roi_height * 0.05)  # Reduced from 0.15 to 0.05
-        
-        x1_expanded = max(0, x1_roi - margin_x)
-        y1_expanded = max(0, y1_roi - margin_y)
-        x2_expanded = min(frame.shape[1], x2_roi + margin_x)
-        y2_expanded = min(frame.shape[0], y2_roi + margin_y)
+        x1_expanded, y1_expanded, x2_expanded, y2_expanded = self._get_expanded_roi(roi, frame_shape)
         
         # Filter detections - keep persons whose FEET touch the piste (with margin)
         # Feet are the bottom part of the bbox (y2 coordinate)
         fencers = []
-        for detection in all_persons:
+        for detection in detections:
             bbox = detection.get('bbox')
             if not bbox or len(bbox) < 4:
                 continue
@@ -142,33 +171,64 @@ class FencerDetector:
         
         return fencers
     
-    def _get_white_ratio(self, frame_hsv: np.ndarray, bbox: Tuple) -> float:
-        """Calculate white pixel ratio for a bbox."""
-        if not bbox or len(bbox) < 4:
-            return 0.0
+    def _get_expanded_roi(self, roi: Tuple, frame_shape: Tuple) -> Tuple[int, int, int, int]:
+        """ROI expanded by the filter margin and clipped to the frame, cached per (ROI, frame size)."""
+        key = (tuple(roi), frame_shape[0], frame_shape[1])
+        if key == self._expanded_roi_key:
+            return self._expanded_roi
         
-        x1, y1, x2, y2 = bbox[:4]
-        roi_hsv = frame_hsv[int(y1):int(y2), int(x1):int(x2)]
+        x1_roi, y1_roi, x2_roi, y2_roi = roi
         
-        if roi_hsv.size == 0:
-            return 0.0
+        # During initialization, we collect all detections without ROI restriction
+        # During tracking (BOUT_ACTIVE), we use the exact ROI with minimal expansion
+        # The ROI is drawn by the user as the exact piste boundaries
+        # Minimal expansion only to account for slight position variation (5% instead of 15%)
+        roi_width = x2_roi - x1_roi
+        roi_height = y2_roi - y1_roi
+        margin_x = int(roi_width * 0.05)  # Reduced from 0.15 to 0.05 for stricter piste adherence
+        margin_y = int(roi_height * 0.05)  # Reduced from 0.15 to 0.05
         
-        white_mask = cv2.inRange(roi_hsv, self.white_threshold_lower, self.white_threshold_upper)
-        return np.count_nonzero(white_mask) / white_mask.size
+        x1_expanded = max(0, x1_roi - margin_x)
+        y1_expanded = max(0, y1_roi - margin_y)
+        x2_expanded = min(frame_shape[1], x2_roi + margin_x)
+        y2_expanded = min(frame_shape[0], y2_roi + margin_y)
+        
+        self._expanded_roi_key = key
+        self._expanded_roi = (x1_expanded, y1_expanded, x2_expanded, y2_expanded)
+        return self._expanded_roi
     
-    def _get_gray_ratio(self, frame_hsv: np.ndarray, bbox: Tuple) -> float:
-        """Calculate light gray pixel ratio for a bbox."""
+    def _get_fencer_color_ratio(self, frame: np.ndarray, bbox: Tuple) -> float:
+        """
+        Calculate the white or light gray pixel ratio (whichever is larger) for a bbox.
+        
+        Only the bbox crop is converted to HSV, not the whole frame, after
+        subsampling it by color_sample_step (color_sample_step_large for crops
+        over color_sample_large_pixels). The two ranges are kept separate:
+        their union would also count pixels that are neither white nor gray.
+        """
         if not bbox or len(bbox) < 4:
             return 0.0
         
         x1, y1, x2, y2 = bbox[:4]
-        roi_hsv = frame_hsv[int(y1):int(y2), int(x1):int(x2)]
+        crop = frame[max(0, int(y1)):int(y2), max(0, int(x1)):int(x2)]
         
-        if roi_hsv.size == 0:
+        if crop.size == 0:
             return 0.0
         
-        gray_mask = cv2.inRange(roi_hsv, self.gray_threshold_lower, self.gray_threshold_upper)
-        return np.count_nonzero(gray_mask) / gray_mask.size
+        h, w = crop.shape[:2]
+        step = self.color_sample_step
+        if h * w > self.color_sample_large_pixels:
+            step = self.color_sample_step_large
+        if step > 1:
+            # Nearest-neighbour resize picks every step-th pixel (SIMD, unlike a strided copy)
+            crop = cv2.resize(crop, ((w + step - 1) // step, (h + step - 1) // step),
+                              interpolation=cv2.INTER_NEAREST)
+        
+        crop_hsv = cv2.cvtColor(crop, cv2.COLOR_BGR2HSV)
+        white_mask = cv2.inRange(crop_hsv, self.white_threshold_lower, self.white_threshold_upper)
+        gray_mask = cv2.inRange(crop_hsv, self.gray_threshold_lower, self.gray_threshold_upper)
+        pixels = crop_hsv.shape[0] * crop_hsv.shape[1]
+        return max(cv2.countNonZero(white_mask), cv2.countNonZero(gray_mask)) / pixels
     
     def set_roi(self, x1: int, y1: int, x2: int, y2: int):
         """Update the ROI for fencer detection."""
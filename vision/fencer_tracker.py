@@ -46,12 +46,19 @@ class FencerTracker:
             dropout_tolerance: Frames before a track is forgotten
         """
         self.max_tracking_distance = max_tracking_distance
+        self._max_tracking_distance_sq = max_tracking_distance ** 2
         self.dropout_tolerance = dropout_tolerance
         
         # State
         self.initialized = False  # True when 2 fencers are locked
         self.fencers: Dict[int, TrackedFencer] = {}  # id -> TrackedFencer
         self.frame_count = 0
+        
+        # Overlap rejections can repeat every frame: print at most one
+        # message per reject_log_interval frames, with the count skipped
+        self.reject_log_interval = 30
+        self._last_reject_log_frame = -self.reject_log_interval
+        self._rejects_not_logged = 0
     
     def update(self, detections: List[Dict], guard_line_detector=None) -> Tuple[List[Dict], Dict]:
         """
@@ -80,19 +87,8 @@ class FencerTracker:
         """
         if len(detections) < self.NUM_FENCERS:
             # Not enough fencers yet - return raw detections as provisional tracks for visualization
-            # Assign provisional IDs (100, 101, ...) to show detections
-            provisional_tracks = []
-            for i, detection in enumerate(sorted(detections, key=lambda d: d.get('bbox', (0, 0, 0, 0))[0])):
-                # Create provisional track with ID 100+i
-                track = {
-                    'id': 100 + i,  # Provisional ID (different from real 1,2)
-                    'bbox': detection.get('bbox'),
-                    'centroid': (
-                        (detection['bbox'][0] + detection['bbox'][2]) / 2.0,
-                        (detection['bbox'][1] + detection['bbox'][3]) / 2.0
-                    ) if 'bbox' in detection else (0, 0)
-                }
-                provisional_tracks.append(track)
+            # Assign provisional IDs (100, 101, ...), different from the real 1, 2
+            provisional_tracks = self._make_provisional_tracks(self._sorted_by_x(detections))
             
             return provisional_tracks, {
                 'initialized': False,
@@ -108,17 +104,7 @@ class FencerTracker:
                 return result
         
         # Guard line initialization not ready yet - wait and show provisional tracks
-        provisional_tracks = []
-        for i, detection in enumerate(sorted(detections, key=lambda d: d.get('bbox', (0, 0, 0, 0))[0])):
-            track = {
-                'id': 100 + i,
-                'bbox': detection.get('bbox'),
-                'centroid': (
-                    (detection['bbox'][0] + detection['bbox'][2]) / 2.0,
-                    (detection['bbox'][1] + detection['bbox'][3]) / 2.0
-                ) if 'bbox' in detection else (0, 0)
-            }
-            provisional_tracks.append(track)
+        provisional_tracks = self._make_provisional_tracks(self._sorted_by_x(detections))
         
         return provisional_tracks, {
             'initialized': False,
@@ -133,42 +119,44 @@ class FencerTracker:
         Once locked, only the 2 fencers are tracked with persistent IDs (1, 2).
         Other detections are shown as provisional tracks (100+) but never locked.
         """
-        # Match detections to existing tracks using centroid distance
-        detection_centroids = np.array([
-            self._centroid_from_bbox(d['bbox']) for d in detections
-        ]) if detections else np.empty((0, 2))
-        
         track_ids = list(self.fencers.keys())
-        track_centroids = np.array([
-            self.fencers[fid].centroid for fid in track_ids
-        ]) if track_ids else np.empty((0, 2))
         
         # Track-to-detection matching
         assigned_tracks = set()
         assigned_detections = set()
+        # Detection centroids, computed once for matching and the provisional tracks
+        centroids = None
         
         if len(detections) > 0 and len(track_ids) > 0:
-            # Distance matrix: rows=tracks, cols=detections
-            distances = np.linalg.norm(
-                track_centroids[:, None, :] - detection_centroids[None, :, :],
-                axis=2
-            )
+            # Match detections to existing tracks using centroid distance
+            # (arrays only built when there is something to match)
+            centroids = [self._centroid_from_bbox(d['bbox']) for d in detections]
+            detection_centroids = np.array(centroids)
+            track_centroids = np.array([
+                self.fencers[fid].centroid for fid in track_ids
+            ])
+            
+            # Squared distance matrix: rows=tracks, cols=detections
+            # (same ordering as distances, without a sqrt per pair)
+            diff = track_centroids[:, None, :] - detection_centroids[None, :, :]
+            distances_sq = (diff * diff).sum(axis=2)
             
             # Greedy matching: for each track, find closest unassigned detection
+            # (assigned detections are masked out with inf instead of re-slicing)
+            detection_used = np.zeros(len(detections), dtype=bool)
             for track_idx, track_id in enumerate(track_ids):
-                if len(unassigned_detections := [i for i in range(len(detections)) if i not in assigned_detections]) == 0:
+                if detection_used.all():
                     break
                 
-                unassigned_dists = distances[track_idx, unassigned_detections]
-                closest_rel_idx = np.argmin(unassigned_dists)
-                closest_detection_idx = unassigned_detections[closest_rel_idx]
-                closest_dist = unassigned_dists[closest_rel_idx]
+                unassigned_dists_sq = np.where(detection_used, np.inf, distances_sq[track_idx])
+                closest_detection_idx = int(unassigned_dists_sq.argmin())
+                closest_dist_sq = unassigned_dists_sq[closest_detection_idx]
                 
-                if closest_dist <= self.max_tracking_distance:
+                if closest_dist_sq <= self._max_tracking_distance_sq:
                     # Update track
                     detection = detections[closest_detection_idx]
                     bbox = detection['bbox']
-                    centroid = self._centroid_from_bbox(bbox)
+                    centroid = centroids[closest_detection_idx]
                     
                     fencer = self.fencers[track_id]
                     
@@ -182,7 +170,13 @@ class FencerTracker:
                         if new_separation < min_separation:
                             # Reject this detection - would cause overlap
                             # Keep the previous fencer position
-                            print(f"[FencerTracker] Fencer {track_id}: Detection rejected (would overlap with Fencer {other_fencer_id}). Separation would be {new_separation:.0f}px (min {min_separation}px)")
+                            if self.frame_count - self._last_reject_log_frame >= self.reject_log_interval:
+                                skipped = f" ({self._rejects_not_logged} more since last message)" if self._rejects_not_logged else ""
+                                print(f"[FencerTracker] Fencer {track_id}: Detection rejected (would overlap with Fencer {other_fencer_id}). Separation would be {new_separation:.0f}px (min {min_separation}px){skipped}")
+                                self._last_reject_log_frame = self.frame_count
+                                self._rejects_not_logged = 0
+                            else:
+                                self._rejects_not_logged += 1
                             fencer.frames_since_detection += 1
                         else:
                             # Safe to update
@@ -192,6 +186,7 @@ class FencerTracker:
                             fencer.frames_alive += 1
                             assigned_tracks.add(track_id)
                             assigned_detections.add(closest_detection_idx)
+                            detection_used[closest_detection_idx] = True
                     else:
                         # No other fencer to check against - safe to update
                         fencer.bbox = bbox
@@ -200,6 +195,7 @@ class FencerTracker:
                         fencer.frames_alive += 1
                         assigned_tracks.add(track_id)
                         assigned_detections.add(closest_detection_idx)
+                        detection_used[closest_detection_idx] = True
         
         # Mark unmatched tracks as missing
         for track_id in track_ids:
@@ -230,16 +226,10 @@ class FencerTracker:
         
         # Also show unmatched detections as "other fencers" (provisional, not locked)
         # This helps visualize if there are other people in the scene
-        other_tracks = []
-        for i, detection_idx in enumerate(range(len(detections))):
-            if detection_idx not in assigned_detections:
-                detection = detections[detection_idx]
-                track = {
-                    'id': 100 + i,  # Provisional ID (never locked)
-                    'bbox': detection.get('bbox'),
-                    'centroid': self._centroid_from_bbox(detection['bbox']) if 'bbox' in detection else (0, 0)
-                }
-                other_tracks.append(track)
+        # Provisional ID is 100 + detection index (never locked)
+        other_tracks = self._make_provisional_tracks(
+            detections, [i for i in range(len(detections)) if i not in assigned_detections], centroids
+        )
         
         # Combine locked fencers + other detections
         all_tracks = locked_tracks + other_tracks
@@ -374,12 +364,13 @@ class FencerTracker:
         if not self.fencers:
             return None
         
-        bboxes = [f.bbox for f in self.fencers.values()]
+        # Transpose the bboxes once instead of scanning them per coordinate
+        x1s, y1s, x2s, y2s = zip(*(f.bbox for f in self.fencers.values()))
         
-        x1_min = min(b[0] for b in bboxes)
-        y1_min = min(b[1] for b in bboxes)
-        x2_max = max(b[2] for b in bboxes)
-        y2_max = max(b[3] for b in bboxes)
+        x1_min = min(x1s)
+        y1_min = min(y1s)
+        x2_max = max(x2s)
+        y2_max = max(y2s)
         
         # Add padding (10% on each side)
         width = x2_max - x1_min
@@ -394,6 +385,38 @@ class FencerTracker:
         
         return (frame_x1, frame_y1, frame_x2, frame_y2)
     
+    @staticmethod
+    def _sorted_by_x(detections: List[Dict]) -> List[Dict]:
+        """Detections ordered left to right (by bbox x1)."""
+        return sorted(detections, key=lambda d: d.get('bbox', (0, 0, 0, 0))[0])
+    
+    @classmethod
+    def _make_provisional_tracks(cls, detections: List[Dict], indices: List[int] = None,
+                                 centroids: List[Tuple[float, float]] = None) -> List[Dict]:
+        """
+        Build provisional (never locked) tracks with ID 100 + index.
+        
+        Args:
+            detections: Detections to show
+            indices: Indices into detections to include (default: all)
+            centroids: Already computed centroid of each detection, if any
+        """
+        if indices is None:
+            indices = range(len(detections))
+        if centroids is not None:
+            return [
+                {'id': 100 + i, 'bbox': detections[i]['bbox'], 'centroid': centroids[i]}
+                for i in indices
+            ]
+        return [
+            {
+                'id': 100 + i,
+                'bbox': detections[i].get('bbox'),
+                'centroid': cls._centroid_from_bbox(detections[i]['bbox']) if 'bbox' in detections[i] else (0, 0)
+            }
+            for i in indices
+        ]
+    
     @staticmethod
     def _centroid_from_bbox(bbox: Tuple[int, int, int, int]) -> Tuple[float, float]:
         x1, y1, x2, y2 = bbox
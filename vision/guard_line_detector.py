@@ -12,6 +12,7 @@ This detector:
 3. Tracks stability on guard lines before locking
 """
 
+from operator import itemgetter
 from typing import List, Dict, Optional, Tuple
 import numpy as np
 
@@ -40,6 +41,9 @@ class GuardLineDetector:
         self.center_tilt = 1.0  # Tilt factor for center line (usually 1.0 - straight)
         
         self.guard_line_tolerance = 20  # pixels tolerance for being "on" guard line
+        
+        # Bumped on every ROI/line change so callers can cache derived geometry
+        self.config_version = 0
     
     def set_roi(self, roi: Tuple[int, int, int, int]) -> None:
         """
@@ -73,6 +77,7 @@ class GuardLineDetector:
         self.left_tilt = 1.0
         self.right_tilt = 1.0
         self.center_tilt = 1.0
+        self.config_version += 1
         
         print(f"[GuardLineDetector] ROI set: {roi}")
         print(f"[GuardLineDetector] Pixels/meter: {self.pixels_per_meter:.2f}")
@@ -101,6 +106,10 @@ class GuardLineDetector:
             self.center_x = self.center_x_calc + offset_x
             self.center_tilt = tilt
             print(f"[GuardLineDetector] Center line adjusted: x={self.center_x:.0f}, tilt={tilt:.2f}")
+        
+        else:
+            return
+        self.config_version += 1
     
     def detect_on_guard_line(self, detections: List[Dict]) -> Dict:
         """
@@ -121,7 +130,6 @@ class GuardLineDetector:
             return {'left': None, 'right': None, 'on_line': [], 'status': '❓ Guard lines not configured'}
         
         x1_roi, y1_roi, x2_roi, y2_roi = self.piste_roi
-        center_y = (y1_roi + y2_roi) / 2.0
         
         on_guard_line = []
         left_fencers = []
@@ -158,14 +166,12 @@ class GuardLineDetector:
         right_detection = None
         
         if left_fencers:
-            # Find the one closest to the guard line
-            left_fencers.sort(key=lambda t: t[2])  # Sort by distance to line
-            left_detection = left_fencers[0][1]
+            # Find the one closest to the guard line (first one on ties)
+            left_detection = min(left_fencers, key=itemgetter(2))[1]
         
         if right_fencers:
             # Find the one closest to the guard line
-            right_fencers.sort(key=lambda t: t[2])  # Sort by distance to line
-            right_detection = right_fencers[0][1]
+            right_detection = min(right_fencers, key=itemgetter(2))[1]
         
         # Status message
         status = "🔍 Waiting for 2 fencers on guard lines"
@@ -5,6 +5,25 @@ from typing import List, Tuple
 from config.shared_roi import get_manual_roi
 
 
+def _cuda_available() -> bool:
+    """True if OpenCV was built with CUDA and a device is present (e.g. Jetson)."""
+    try:
+        return cv2.cuda.getCudaEnabledDeviceCount() > 0
+    except (AttributeError, cv2.error):
+        return False
+
+
+def find_bands(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find runs of consecutive True rows in a 1D mask.
+    
+    Returns:
+        (starts, ends) int arrays, ends exclusive
+    """
+    edges = np.diff(mask.astype(np.int8), prepend=0, append=0)
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
 class PisteDetector:
     """
     Detect fencing pistes (fencer detection area).
@@ -19,17 +38,21 @@ class PisteDetector:
         saturation_threshold: int = 35,
         gray_coverage_threshold: float = 0.5,
         min_piste_height: int = 15,
+        use_cuda: bool = None,
     ):
         """
         Args:
             saturation_threshold: HSV saturation threshold for gray pixels
             gray_coverage_threshold: Minimum fraction of row that must be gray
             min_piste_height: Minimum height for a region
+            use_cuda: Run the saturation projection on the GPU (None = auto-detect)
         """
         self.saturation_threshold = saturation_threshold
         self.gray_coverage_threshold = gray_coverage_threshold
         self.min_piste_height = min_piste_height
         self.manual_roi = None  # Manual piste ROI if set by user
+        self.use_cuda = _cuda_available() if use_cuda is None else use_cuda
+        self._gpu_frame = None  # Reused upload buffer for the CUDA path
 
     def detect(self, frame: np.ndarray) -> List[Tuple[int, int, int, int]]:
         """
@@ -67,45 +90,27 @@ class PisteDetector:
         
         h, w = frame.shape[:2]
         
-        # Convert to HSV
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-        saturation = hsv[:, :, 1]
-        
-        # Gray pixels have low saturation
-        gray_mask = saturation < self.saturation_threshold
-        
-        # Horizontal projection
-        h_proj = np.sum(gray_mask.astype(np.uint8), axis=1)
+        # Horizontal projection of gray (low saturation) pixels
+        h_proj = None
+        if self.use_cuda:
+            h_proj = self._gray_projection_cuda(frame)
+        if h_proj is None:
+            h_proj = self._gray_projection_cpu(frame)
         
         # Threshold for region detection
         gray_threshold = int(w * self.gray_coverage_threshold)
         
         # Find regions with sufficient gray coverage
-        piste_regions = []
-        in_piste = False
-        piste_start = 0
-        
-        for y in range(h):
-            if h_proj[y] >= gray_threshold:
-                if not in_piste:
-                    piste_start = y
-                    in_piste = True
-            else:
-                if in_piste:
-                    if y - piste_start >= self.min_piste_height:
-                        piste_regions.append((piste_start, y))
-                    in_piste = False
-        
-        if in_piste and h - piste_start >= self.min_piste_height:
-            piste_regions.append((piste_start, h))
+        starts, ends = find_bands(h_proj >= gray_threshold)
+        heights = ends - starts
         
         # Filter to reasonable piste regions
         # True pistes are: 16-20px (P1/P2) or can be from 15-70px (P3 as merged region)
         # We'll split large regions (>50px) later
-        piste_regions = [
-            (y1, y2) for y1, y2 in piste_regions
-            if 15 <= (y2 - y1) <= 70 and 350 <= y1 < 600
-        ]
+        keep = ((heights >= self.min_piste_height)
+                & (heights >= 15) & (heights <= 70)
+                & (starts >= 350) & (starts < 600))
+        piste_regions = list(zip(starts[keep].tolist(), ends[keep].tolist()))
         
         if len(piste_regions) == 0:
             piste_height = h // 4
@@ -124,6 +129,42 @@ class PisteDetector:
         
         return result
     
+    def _gray_projection_cpu(self, frame: np.ndarray) -> np.ndarray:
+        """Count low-saturation pixels per row."""
+        # Convert to HSV
+        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+        saturation = cv2.extractChannel(hsv, 1)
+        
+        # Gray pixels have low saturation: 1 where saturation < threshold,
+        # summed per row by OpenCV (same steps as the CUDA path)
+        _, gray_mask = cv2.threshold(
+            saturation, self.saturation_threshold - 1, 1, cv2.THRESH_BINARY_INV
+        )
+        return cv2.reduce(gray_mask, 1, cv2.REDUCE_SUM, dtype=cv2.CV_32S).reshape(-1)
+    
+    def _gray_projection_cuda(self, frame: np.ndarray):
+        """
+        Same as _gray_projection_cpu on the GPU; only the per-row counts are downloaded.
+        
+        Returns None (and disables the CUDA path) if a CUDA call fails.
+        """
+        try:
+            if self._gpu_frame is None:
+                self._gpu_frame = cv2.cuda_GpuMat()
+            self._gpu_frame.upload(frame)
+            hsv = cv2.cuda.cvtColor(self._gpu_frame, cv2.COLOR_BGR2HSV)
+            saturation = cv2.cuda.split(hsv)[1]
+            # 1 where saturation < threshold, i.e. saturation <= threshold - 1
+            _, gray_mask = cv2.cuda.threshold(
+                saturation, self.saturation_threshold - 1, 1, cv2.THRESH_BINARY_INV
+            )
+            h_proj = cv2.cuda.reduce(gray_mask, 1, cv2.REDUCE_SUM, dtype=cv2.CV_32S)
+            return h_proj.download().reshape(-1)
+        except cv2.error as e:
+            print(f"[PisteDetector] CUDA path failed, using CPU: {e}")
+            self.use_cuda = False
+            return None
+    
     def _find_bands_from_edges(self, edge_proj: np.ndarray, h: int, w: int) -> List[Tuple[int, int]]:
         """Placeholder - not used with saturation-based detection."""
         return []
@@ -190,25 +231,18 @@ class PisteDetector:
     def _remove_overlaps(self, regions: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
         """Remove overlapping or too-close piste regions, keeping the best ones."""
         if len(regions) <= 4:
-            # If we have 4 or fewer, they're probably good - just ensure no overlaps
+            # If we have 4 or fewer, they're probably good - just ensure no overlaps.
+            # Sorted by start, a region can only overlap the last one kept
             filtered = []
-            for y1, y2 in regions:
-                # Check if this overlaps with any already-added region
-                overlaps = False
-                for existing_y1, existing_y2 in filtered:
-                    # Regions overlap if one starts before the other ends
-                    if y1 < existing_y2 and y2 > existing_y1:
-                        # Keep the larger one
-                        if (y2 - y1) > (existing_y2 - existing_y1):
-                            filtered.remove((existing_y1, existing_y2))
-                        else:
-                            overlaps = True
-                            break
-                
-                if not overlaps:
+            for y1, y2 in sorted(regions):
+                if filtered and y1 < filtered[-1][1]:
+                    # Keep the larger one
+                    if (y2 - y1) > (filtered[-1][1] - filtered[-1][0]):
+                        filtered[-1] = (y1, y2)
+                else:
                     filtered.append((y1, y2))
             
-            return sorted(filtered)
+            return filtered
         
         # If we have > 4 pistes, keep only the 4 largest
         regions_with_size = [(y2 - y1, y1, y2) for y1, y2 in regions]
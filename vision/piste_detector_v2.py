@@ -2,6 +2,7 @@
 import cv2
 import numpy as np
 from typing import List, Tuple, Optional
+from vision.piste_detector import find_bands
 
 class PisteDetectorV2:
     """Detect multiple fixed pistes using morphology and contour analysis."""
@@ -47,41 +48,25 @@ class PisteDetectorV2:
         kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (self.close_kernel, self.close_kernel))
         bright = cv2.morphologyEx(bright, cv2.MORPH_CLOSE, kernel, iterations=1)
         
-        # Horizontal projection: sum brightness per row
-        h_proj = np.sum(bright, axis=1)
+        # Horizontal projection: sum brightness per row (OpenCV row reduce, int32)
+        h_proj = cv2.reduce(bright, 1, cv2.REDUCE_SUM, dtype=cv2.CV_32S).reshape(-1)
         
         # Normalize projection
-        max_proj = np.max(h_proj) if np.max(h_proj) > 0 else 1
+        max_proj = h_proj.max()
+        if max_proj <= 0:
+            max_proj = 1
         h_proj_norm = h_proj / max_proj
         
         # Find local maxima (bright rows = likely piste boundaries)
         # Use a conservative threshold
         threshold = 0.15
         
-        piste_regions = []
-        state = 'dark'  # start in dark region
-        region_start = 0
-        
-        for y in range(h):
-            is_bright = h_proj_norm[y] > threshold
-            
-            if state == 'dark' and is_bright:
-                # Entering bright region
-                region_start = y
-                state = 'bright'
-            elif state == 'bright' and not is_bright:
-                # Leaving bright region
-                region_height = y - region_start
-                # Only accept regions with reasonable height (pistes should be ~100-150px)
-                if region_height > 40:
-                    piste_regions.append((region_start, y))
-                state = 'dark'
-        
-        # Handle last region
-        if state == 'bright':
-            region_height = h - region_start
-            if region_height > 40:
-                piste_regions.append((region_start, h))
+        # Bright bands; only accept regions with reasonable height (pistes should be ~100-150px)
+        starts, ends = find_bands(h_proj_norm > threshold)
+        piste_regions = [
+            (y1, y2) for y1, y2 in zip(starts.tolist(), ends.tolist())
+            if y2 - y1 > 40
+        ]
         
         # Convert to bounding boxes
         result = []
@@ -14,6 +14,9 @@ class PisteDetectorV3:
         hough_min_length: float = 0.6,  # fraction of image width
         hough_max_gap: float = 0.1,  # fraction of image width
         horizontal_tolerance: float = 5,  # degrees tolerance for horizontal
+        recompute_every: int = 30,  # frames between full Hough passes
+        scene_change_threshold: float = 10.0,  # mean brightness change forcing a recompute
+        scale: int = 1,  # run edge/Hough detection at 1/scale resolution
     ):
         self.canny_low = canny_low
         self.canny_high = canny_high
@@ -21,10 +24,20 @@ class PisteDetectorV3:
         self.hough_min_length = hough_min_length
         self.hough_max_gap = hough_max_gap
         self.horizontal_tolerance = horizontal_tolerance
+        self.recompute_every = recompute_every
+        self.scene_change_threshold = scene_change_threshold
+        self.scale = max(1, int(scale))
         
-        # Cache for detected separators (should be stable)
+        # Cache for detected separators (should be stable): reused for
+        # recompute_every frames unless the frame size or brightness changes
         self._cached_separators = None
         self._cached_frame_count = 0
+        self._cached_shape = None
+        self._cached_brightness = 0.0
+    
+    def invalidate(self):
+        """Force the next detect() to run the full edge/Hough pass."""
+        self._cached_separators = None
     
     def detect(self, frame: np.ndarray) -> List[Tuple[int, int, int, int]]:
         """
@@ -38,9 +51,61 @@ class PisteDetectorV3:
         
         h, w = frame.shape[:2]
         
+        # Cheap scene checksum: mean of a 16x subsampled frame
+        brightness = float(frame[::16, ::16].mean())
+        if (self._cached_separators is not None
+                and self._cached_frame_count < self.recompute_every
+                and self._cached_shape == frame.shape
+                and abs(brightness - self._cached_brightness) <= self.scene_change_threshold):
+            self._cached_frame_count += 1
+            separators = self._cached_separators
+        else:
+            separators = self._find_separators(frame)
+            self._cached_separators = separators
+            self._cached_frame_count = 1
+            self._cached_shape = frame.shape
+            self._cached_brightness = brightness
+        
+        # No horizontal lines at all
+        if not separators:
+            return []
+        
+        # Build piste regions from separators
+        piste_regions = []
+        
+        # Region before first separator (piste 1)
+        piste_regions.append((0, separators[0]))
+        
+        # Regions between separators
+        for i in range(len(separators) - 1):
+            piste_regions.append((separators[i], separators[i+1]))
+        
+        # Region after last separator
+        piste_regions.append((separators[-1], h))
+        
+        # Convert to bounding boxes and filter small regions
+        result = []
+        min_height = 40  # minimum piste height
+        
+        for y1, y2 in piste_regions:
+            if y2 - y1 >= min_height:
+                result.append((0, y1, w, y2))
+        
+        return result
+    
+    def _find_separators(self, frame: np.ndarray) -> List[int]:
+        """Sorted y positions of the horizontal piste separators (empty if no lines)."""
         # Grayscale
         gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
         
+        # Optionally find edges and lines on a downscaled image: ~4x faster at
+        # scale=2, but on test.mp4 separators move about 3x more between frames
+        scale = self.scale
+        if scale > 1:
+            gray = cv2.resize(gray, (gray.shape[1] // scale, gray.shape[0] // scale),
+                              interpolation=cv2.INTER_AREA)
+        h, w = gray.shape[:2]
+        
         # Edge detection
         edges = cv2.Canny(gray, self.canny_low, self.canny_high)
         
@@ -62,68 +127,31 @@ class PisteDetectorV3:
         )
         
         # Extract horizontal lines (separators)
-        horizontal_lines = []
-        if lines is not None:
-            for line in lines:
-                x1, y1, x2, y2 = line[0]
-                # Check if line is roughly horizontal
-                angle_deg = abs(np.arctan2(y2 - y1, x2 - x1) * 180 / np.pi)
-                if angle_deg < self.horizontal_tolerance or angle_deg > (180 - self.horizontal_tolerance):
-                    # Average y position
-                    y_avg = (y1 + y2) // 2
-                    horizontal_lines.append((y_avg, min(x1, x2), max(x1, x2)))
-        
-        # Cluster nearby horizontal lines (multiple detections of same separator)
-        if not horizontal_lines:
+        if lines is None:
             return []
+        # (N, 1, 4) in OpenCV 4, (N, 4) in OpenCV 5
+        lines = lines.reshape(-1, 4)
+        x1, y1, x2, y2 = lines.T
         
-        horizontal_lines.sort()
-        separators = []
-        current_group = [horizontal_lines[0][0]]
+        # Keep roughly horizontal lines
+        angle_deg = np.abs(np.arctan2(y2 - y1, x2 - x1) * 180 / np.pi)
+        horizontal = (angle_deg < self.horizontal_tolerance) | (angle_deg > (180 - self.horizontal_tolerance))
         
-        for y, x1, x2 in horizontal_lines[1:]:
-            if y - current_group[-1] < 20:  # cluster tolerance
-                current_group.append(y)
-            else:
-                # Average the cluster
-                sep_y = int(np.mean(current_group))
-                separators.append(sep_y)
-                current_group = [y]
-        
-        # Add last cluster
-        if current_group:
-            sep_y = int(np.mean(current_group))
-            separators.append(sep_y)
-        
-        # Sort separators
-        separators = sorted(set(separators))
-        
-        # Build piste regions from separators
-        piste_regions = []
-        
-        # Region before first separator (piste 1)
-        if separators:
-            piste_regions.append((0, separators[0]))
-            
-            # Regions between separators
-            for i in range(len(separators) - 1):
-                piste_regions.append((separators[i], separators[i+1]))
-            
-            # Region after last separator
-            piste_regions.append((separators[-1], h))
-        else:
-            # No separators found, treat whole image as one piste
-            piste_regions.append((0, h))
+        # Average y position of each line, sorted
+        y_avg = np.sort((y1[horizontal] + y2[horizontal]) // 2) * scale
         
-        # Convert to bounding boxes and filter small regions
-        result = []
-        min_height = 40  # minimum piste height
+        # Cluster nearby horizontal lines (multiple detections of same separator)
+        if y_avg.size == 0:
+            return []
         
-        for y1, y2 in piste_regions:
-            if y2 - y1 >= min_height:
-                result.append((0, y1, w, y2))
+        # A new cluster starts wherever the gap to the previous line is >= 20px
+        # (cluster tolerance); each separator is its cluster's mean y
+        cluster_ids = np.concatenate(([0], np.cumsum(np.diff(y_avg) >= 20)))
+        cluster_means = np.bincount(cluster_ids, weights=y_avg) / np.bincount(cluster_ids)
+        separators = cluster_means.astype(int).tolist()
         
-        return result
+        # Sort separators
+        return sorted(set(separators))
     
     def __call__(self, frame: np.ndarray) -> List[Tuple[int, int, int, int]]:
         """Shorthand for detect()."""
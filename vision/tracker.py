@@ -1,7 +1,10 @@
 """Simple centroid-based tracker for stable IDs.
 
-This tracker is intentionally lightweight and dependency-free. It matches
-detections between frames by centroid distance and assigns persistent IDs.
+This tracker is lightweight and needs only NumPy by default, with optional
+SciPy/Numba acceleration. It matches detections between frames by centroid
+distance and assigns persistent IDs. When SciPy is installed the matching is
+optimal (minimum total distance); otherwise it is greedy, with the loop
+compiled by Numba when available.
 
 Track structure returned by `update()`:
   {'id': int, 'bbox': (x1,y1,x2,y2), 'centroid': (cx,cy)}
@@ -10,6 +13,108 @@ from typing import List, Dict, Tuple
 import numpy as np
 
 
+def _assign_loops(tracks_xy: np.ndarray, dets_xy: np.ndarray, max_dist: float):
+    """Greedily match track centroids to detection centroids.
+
+    Tracks are visited by increasing distance to their nearest detection and
+    take that detection unless an earlier track already has it or it is
+    further than max_dist. Written as explicit loops for Numba; distances
+    are compared squared, which keeps the same order without a sqrt.
+
+    Returns:
+        (nearest, matches): int arrays with the nearest detection index per
+        track and the matched detection index per track (-1 if unmatched)
+    """
+    n_tracks = tracks_xy.shape[0]
+    n_dets = dets_xy.shape[0]
+    nearest = np.empty(n_tracks, dtype=np.int64)
+    nearest_dist_sq = np.empty(n_tracks, dtype=np.float64)
+    for r in range(n_tracks):
+        best = 0
+        best_dist_sq = np.inf
+        for c in range(n_dets):
+            dx = tracks_xy[r, 0] - dets_xy[c, 0]
+            dy = tracks_xy[r, 1] - dets_xy[c, 1]
+            dist_sq = dx * dx + dy * dy
+            if dist_sq < best_dist_sq:
+                best = c
+                best_dist_sq = dist_sq
+        nearest[r] = best
+        nearest_dist_sq[r] = best_dist_sq
+
+    max_dist_sq = max_dist * max_dist
+    matches = np.full(n_tracks, -1, dtype=np.int64)
+    used = np.zeros(n_dets, dtype=np.bool_)
+    for r in np.argsort(nearest_dist_sq, kind="mergesort"):
+        c = nearest[r]
+        if used[c] or nearest_dist_sq[r] > max_dist_sq:
+            continue
+        matches[r] = c
+        used[c] = True
+    return nearest, matches
+
+
+def _assign_numpy(tracks_xy: np.ndarray, dets_xy: np.ndarray, max_dist: float):
+    """Same as _assign_loops from the full distance matrix, returning lists.
+
+    Faster than interpreted loops when Numba is not installed.
+    """
+    # squared distances: rows = tracks, cols = detections
+    diff = tracks_xy[:, None, :] - dets_xy[None, :, :]
+    D_sq = (diff * diff).sum(axis=2)
+    nearest_arr = D_sq.argmin(axis=1)
+    nearest_dist_sq = D_sq[np.arange(len(nearest_arr)), nearest_arr].tolist()
+    nearest = nearest_arr.tolist()
+
+    max_dist_sq = max_dist * max_dist
+    matches = [-1] * len(nearest)
+    used = set()
+    for r in sorted(range(len(nearest)), key=nearest_dist_sq.__getitem__):
+        c = nearest[r]
+        if c in used or nearest_dist_sq[r] > max_dist_sq:
+            continue
+        matches[r] = c
+        used.add(c)
+    return nearest, matches
+
+
+def _assign_optimal(tracks_xy: np.ndarray, dets_xy: np.ndarray, max_dist: float):
+    """Match track centroids to detections with minimum total distance (SciPy).
+
+    Pairs further than max_dist cost more than any set of in-range pairs, so
+    the assignment first matches as many in-range pairs as possible, then
+    minimises their total distance; out-of-range pairs are left unmatched.
+    Unlike the greedy match, two tracks near the same detection cannot
+    leave a closer alternative unused.
+
+    Returns:
+        Same (nearest, matches) as _assign_loops
+    """
+    D = np.linalg.norm(tracks_xy[:, None, :] - dets_xy[None, :, :], axis=2)
+    nearest = D.argmin(axis=1).tolist()
+    out_of_range = D > max_dist
+    cost = np.where(out_of_range, max_dist * (min(D.shape) + 1) + 1.0, D)
+    rows, cols = linear_sum_assignment(cost)
+
+    matches = [-1] * len(nearest)
+    for r, c in zip(rows.tolist(), cols.tolist()):
+        if not out_of_range[r, c]:
+            matches[r] = c
+    return nearest, matches
+
+
+# Optimal matching with SciPy; greedy otherwise, Numba-compiled when available
+try:
+    from scipy.optimize import linear_sum_assignment
+    _assign = _assign_optimal
+except ImportError:
+    try:
+        from numba import njit
+        _assign = njit(cache=True)(_assign_loops)
+    except ImportError:
+        _assign = _assign_numpy
+
+
 class CentroidTracker:
     def __init__(self, max_disappeared: int = 10, max_distance: float = 50.0):
         self.next_id = 1
@@ -18,6 +123,8 @@ class CentroidTracker:
         self.disappeared = {}  # id -> frames disappeared
         self.max_disappeared = max_disappeared
         self.max_distance = max_distance
+        # Compile (or load from cache) the Numba kernel now, not on the first frame
+        _assign(np.zeros((1, 2)), np.zeros((1, 2)), float(max_distance))
 
     @staticmethod
     def _centroid_from_bbox(bbox: Tuple[float, float, float, float]):
@@ -60,7 +167,7 @@ class CentroidTracker:
             ]
 
         input_bboxes = [d["bbox"] for d in detections]
-        input_centroids = np.array([self._centroid_from_bbox(b) for b in input_bboxes])
+        input_centroids = np.array([self._centroid_from_bbox(b) for b in input_bboxes], dtype=np.float64)
 
         if len(self.objects) == 0:
             # register all
@@ -69,25 +176,17 @@ class CentroidTracker:
         else:
             # build distance matrix
             object_ids = list(self.centroids.keys())
-            object_centroids = np.array([self.centroids[i] for i in object_ids])
-
-            # distances: rows = objects, cols = inputs
-            D = np.linalg.norm(object_centroids[:, None, :] - input_centroids[None, :, :], axis=2)
+            object_centroids = np.array([self.centroids[i] for i in object_ids], dtype=np.float64)
 
             # for each object, find closest input; greedy matching
-            rows = D.min(axis=1).argsort()
-            cols = D.argmin(axis=1)[rows]
+            nearest, matches = _assign(object_centroids, input_centroids, float(self.max_distance))
 
             assigned_cols = set()
-            for r, c in zip(rows, cols):
-                if c in assigned_cols:
-                    continue
-                dist = D[r, c]
-                if dist > self.max_distance:
+            for r, c in enumerate(matches):
+                if c < 0:
                     continue
                 obj_id = object_ids[r]
-                bbox = input_bboxes[c]
-                self.objects[obj_id] = bbox
+                self.objects[obj_id] = input_bboxes[c]
                 self.centroids[obj_id] = tuple(input_centroids[c].tolist())
                 self.disappeared[obj_id] = 0
                 assigned_cols.add(c)
@@ -97,8 +196,9 @@ class CentroidTracker:
                 if i not in assigned_cols:
                     self.register(bbox)
 
-            # mark disappeared for unassigned existing
-            assigned_ids = {object_ids[r] for r, c in zip(rows, cols) if c in assigned_cols}
+            # mark disappeared for unassigned existing (objects whose closest
+            # input went to another object are not aged)
+            assigned_ids = {object_ids[r] for r, c in enumerate(nearest) if c in assigned_cols}
             for obj_id in list(self.objects.keys()):
                 if obj_id not in assigned_ids and obj_id in self.disappeared:
                     self.disappeared[obj_id] += 1
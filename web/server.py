@@ -1,19 +1,23 @@
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse, JSONResponse, FileResponse
+from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 import threading
+import time
+import hashlib
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 import uvicorn
 import os
-import urllib.request
+import httpx
 from fastapi.responses import StreamingResponse, Response
+from starlette.background import BackgroundTask
 import subprocess
 import sys
-import json
 
 # Import shared ROI config
 try:
-    from config.shared_roi import set_manual_roi, get_manual_roi
+    from config.shared_roi import set_manual_roi, get_manual_roi, clear_manual_roi
     SHARED_ROI_AVAILABLE = True
     print("[Server] ✓ Successfully imported shared_roi")
 except ImportError as e:
@@ -21,6 +25,7 @@ except ImportError as e:
     print(f"[Server] ✗ Failed to import shared_roi: {e}")
     def set_manual_roi(*args): pass
     def get_manual_roi(): return None
+    def clear_manual_roi(): pass
 
 # Import shared visibility config
 try:
@@ -45,6 +50,10 @@ except ImportError as e:
     def get_guard_lines_adjustments(): return {}
     def reset_guard_lines_adjustments(): return {}
 
+# Pipeline stats are written by the pipeline process; re-parsed only when the file changes
+from config.json_store import JsonCache
+_pipeline_stats = JsonCache("config/pipeline_stats.json")
+
 # Import piste detector for ROI detection
 try:
     from vision.piste_detector import PisteDetector
@@ -53,7 +62,14 @@ try:
 except ImportError:
     PISTE_DETECTOR_AVAILABLE = False
 
-app = FastAPI()
+@asynccontextmanager
+async def _lifespan(app):
+    yield
+    # Release the pooled upstream connections of the stream proxies
+    await _proxy_client.aclose()
+
+
+app = FastAPI(lifespan=_lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -77,9 +93,31 @@ _config = {
 }
 
 
+# index.html is read once; in DEV mode it is re-read when its mtime changes so
+# edits show up without a restart. Holds (mtime_ns, content, etag).
+_index_path = os.path.join(static_dir, "index.html")
+_index_cache = None
+
+
+def _load_index():
+    global _index_cache
+    mtime = os.stat(_index_path).st_mtime_ns
+    if _index_cache is None or _index_cache[0] != mtime:
+        with open(_index_path, "rb") as f:
+            content = f.read()
+        _index_cache = (mtime, content, '"' + hashlib.sha1(content).hexdigest()[:16] + '"')
+    return _index_cache
+
+
 @app.get("/", response_class=HTMLResponse)
-def index():
-    return FileResponse(os.path.join(static_dir, "index.html"))
+def index(request: Request):
+    cached = _index_cache
+    if cached is None or _config["mode"] == "DEV":
+        cached = _load_index()
+    _, content, etag = cached
+    if request.headers.get('if-none-match') == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=content, media_type="text/html", headers={"ETag": etag})
 
 
 @app.get("/api/status")
@@ -96,14 +134,13 @@ def status():
 def fencer_count():
     """Get current detected fencer count from pipeline stats."""
     try:
-        if os.path.exists("config/pipeline_stats.json"):
-            with open("config/pipeline_stats.json", 'r') as f:
-                stats = json.load(f)
-                return JSONResponse({
-                    "success": True,
-                    "fencer_count": stats.get("fencer_count", 0),
-                    "timestamp": stats.get("timestamp", 0)
-                })
+        stats = _pipeline_stats.load()
+        if stats is not None:
+            return JSONResponse({
+                "success": True,
+                "fencer_count": stats.get("fencer_count", 0),
+                "timestamp": stats.get("timestamp", 0)
+            })
         else:
             return JSONResponse({
                 "success": True,
@@ -123,18 +160,17 @@ def fencer_count():
 def guard_validation_status():
     """Get current guard line validation status for fencers."""
     try:
-        if os.path.exists("config/pipeline_stats.json"):
-            with open("config/pipeline_stats.json", 'r') as f:
-                stats = json.load(f)
-                validation = stats.get("guard_validation", {})
-                return JSONResponse({
-                    "success": True,
-                    "fencer_1_on_guard": validation.get("fencer_1_on_guard", False),
-                    "fencer_2_on_guard": validation.get("fencer_2_on_guard", False),
-                    "both_on_guard": validation.get("both_on_guard", False),
-                    "status": validation.get("status", "Initializing..."),
-                    "timestamp": stats.get("timestamp", 0)
-                })
+        stats = _pipeline_stats.load()
+        if stats is not None:
+            validation = stats.get("guard_validation", {})
+            return JSONResponse({
+                "success": True,
+                "fencer_1_on_guard": validation.get("fencer_1_on_guard", False),
+                "fencer_2_on_guard": validation.get("fencer_2_on_guard", False),
+                "both_on_guard": validation.get("both_on_guard", False),
+                "status": validation.get("status", "Initializing..."),
+                "timestamp": stats.get("timestamp", 0)
+            })
         else:
             return JSONResponse({
                 "success": True,
@@ -171,49 +207,58 @@ def detect_pistes():
         return JSONResponse({"error": f"Video file not found: {VIDEO_PATH}"}, status_code=404)
     
     try:
-        source = VideoFileSource(VIDEO_PATH)
+        # Decode in a background thread while this one runs the detector
+        source = VideoFileSource(VIDEO_PATH, threaded=True)
         piste_detector = PisteDetector()
         
         detected_rois = []
-        piste_all_frames = {}  # piste_index -> list of frames where it appears
+        first_roi = {}  # piste_index -> ROI when it was first seen
+        counts = {}  # piste_index -> number of frames where it appears
         frame_count = 0
         max_samples = 100  # sample first 100 frames
+        stable_streak = 0  # consecutive frames without a new piste index
         
-        while frame_count < max_samples:
-            ret, frame = source.read()
-            if not ret:
-                break
-            
-            frame_count += 1
-            piste_boxes = piste_detector.detect(frame)
+        try:
+            while frame_count < max_samples:
+                ret, frame = source.read()
+                if not ret:
+                    break
+                
+                frame_count += 1
+                piste_boxes = piste_detector.detect(frame)
+                new_piste = False
+                
+                if piste_boxes:
+                    for piste_idx, (x1, y1, x2, y2) in enumerate(piste_boxes):
+                        counts[piste_idx] = counts.get(piste_idx, 0) + 1
+                        if piste_idx not in first_roi:
+                            new_piste = True
+                            first_roi[piste_idx] = {
+                                "id": piste_idx,
+                                "x1": int(x1),
+                                "y1": int(y1),
+                                "x2": int(x2),
+                                "y2": int(y2),
+                                "width": int(x2 - x1),
+                                "height": int(y2 - y1),
+                            }
+                
+                # Pistes don't move: stop once every piste seen is stable and
+                # no new one has turned up for a while
+                stable_streak = 0 if new_piste else stable_streak + 1
+                if stable_streak > 20 and counts and all(n > 5 for n in counts.values()):
+                    break
             
-            if piste_boxes:
-                for piste_idx, (x1, y1, x2, y2) in enumerate(piste_boxes):
-                    roi = {
-                        "id": piste_idx,
-                        "x1": int(x1),
-                        "y1": int(y1),
-                        "x2": int(x2),
-                        "y2": int(y2),
-                        "width": int(x2 - x1),
-                        "height": int(y2 - y1),
-                    }
-                    
-                    if piste_idx not in piste_all_frames:
-                        piste_all_frames[piste_idx] = {"roi": roi, "frames": []}
-                    piste_all_frames[piste_idx]["frames"].append(frame_count)
-        
-        source.release()
+        finally:
+            source.release()
         
         # Build final ROI list from most common pistes
         unique_rois = []
-        for piste_idx in sorted(piste_all_frames.keys()):
-            info = piste_all_frames[piste_idx]
-            roi = info["roi"]
-            appearances = len(info["frames"])
+        for piste_idx in sorted(first_roi):
+            roi = first_roi[piste_idx]
             
             # Only include pistes that appear in a reasonable number of frames
-            if appearances > 5:
+            if counts[piste_idx] > 5:
                 roi["id"] = len(unique_rois)
                 unique_rois.append(roi)
         
@@ -224,7 +269,7 @@ def detect_pistes():
         return JSONResponse({
             "success": True,
             "total_frames_sampled": frame_count,
-            "total_piste_detections": len(piste_all_frames),
+            "total_piste_detections": len(first_roi),
             "stable_pistes": len(unique_rois),
             "rois": unique_rois,
         })
@@ -288,7 +333,6 @@ async def select_roi(request: Request):
 async def clear_roi():
     """Clear the manually selected piste ROI and reset the system."""
     try:
-        from config.shared_roi import clear_manual_roi
         clear_manual_roi()
         _config["selected_piste"] = None
         return JSONResponse({
@@ -393,6 +437,8 @@ def get_fencers_count():
 
 
 def run_server(port: int = 8000, background: bool = True):
+    # uvicorn picks uvloop and httptools by itself when they are installed
+    # (uvicorn[standard]); single process since _config lives in memory
     if background:
         # Start uvicorn in a separate process so it outlives the short-lived
         # caller (e.g. `python -c 'run_server(..., background=True)'`).
@@ -404,60 +450,126 @@ def run_server(port: int = 8000, background: bool = True):
 
         out = open(os.path.join(logs_dir, f"web_{port}.log"), "a")
         err = out
-        cmd = [sys.executable, "-m", "uvicorn", "web.server:app", "--host", "0.0.0.0", "--port", str(port), "--log-level", "warning"]
+        cmd = [sys.executable, "-m", "uvicorn", "web.server:app", "--host", "0.0.0.0", "--port", str(port), "--log-level", "warning",
+               "--no-access-log"]
         # start_new_session=True detaches the child from the parent's process group
         subprocess.Popen(cmd, stdout=out, stderr=err, start_new_session=True)
     else:
-        uvicorn.run(app, host="0.0.0.0", port=port, log_level="warning")
+        uvicorn.run(app, host="0.0.0.0", port=port, log_level="warning", access_log=False)
 
 
-@app.get('/proxy/hls/{path:path}')
-def proxy_hls(path: str):
-    """Proxy HLS files from the local MediaMTX HLS endpoint so the browser can fetch them."""
-    upstream = f'http://127.0.0.1:8888/{path}'
-    req = urllib.request.Request(upstream, headers={"User-Agent": "escrime-proxy"})
+# Shared by the proxy routes so upstream connections are pooled; reads time out
+# like connects so a stalled upstream ends the stream instead of hanging it
+_proxy_client = httpx.AsyncClient(timeout=10, headers={"User-Agent": "escrime-proxy"})
+
+# Chunk size for relayed streams (aiter_raw yields data as it arrives, up to this)
+PROXY_CHUNK_SIZE = 64 * 1024
+
+
+async def _open_upstream(url: str):
+    """Start a streamed GET to url. Returns (response, None) or (None, 502 response)."""
     try:
-        resp = urllib.request.urlopen(req, timeout=10)
-    except Exception as e:
-        return JSONResponse({"error": str(e)}, status_code=502)
-    data = resp.read()
-    ctype = resp.getheader('Content-Type') or 'application/vnd.apple.mpegurl'
-    return Response(content=data, media_type=ctype)
+        resp = await _proxy_client.send(_proxy_client.build_request("GET", url), stream=True)
+    except httpx.HTTPError as e:
+        return None, JSONResponse({"error": str(e)}, status_code=502)
+    if resp.is_error:
+        await resp.aclose()
+        return None, JSONResponse({"error": f"upstream returned {resp.status_code}"}, status_code=502)
+    return resp, None
 
 
-@app.get('/proxy/mjpeg')
-def proxy_mjpeg():
-    """Proxy MJPEG multipart stream from the local MJPEG preview server."""
-    upstream = 'http://127.0.0.1:8080/preview'
-    req = urllib.request.Request(upstream, headers={"User-Agent": "escrime-proxy"})
+async def _relay(resp: httpx.Response, name: str):
     try:
-        resp = urllib.request.urlopen(req, timeout=10)
-    except Exception as e:
-        return JSONResponse({"error": str(e)}, status_code=502)
+        async for chunk in resp.aiter_raw(PROXY_CHUNK_SIZE):
+            yield chunk
+    except httpx.HTTPError as e:
+        # Handle incomplete reads and other issues without crashing server
+        print(f"[{name}] Stream read error: {e}")
+
+
+# Published HLS segments never change, so recently served ones are kept in
+# memory: path -> (expiry, etag, content type, data), least recently used first
+HLS_SEGMENT_SUFFIXES = ('.ts', '.mp4', '.m4s')
+HLS_SEGMENT_TTL = 60.0
+HLS_CACHE_MAX_BYTES = 100 * 1024 * 1024
+_hls_segments = OrderedDict()
+_hls_cache_bytes = 0
+
+
+def _cache_hls_segment(path: str, entry: tuple):
+    global _hls_cache_bytes
+    old = _hls_segments.pop(path, None)
+    if old is not None:
+        _hls_cache_bytes -= len(old[3])
+    _hls_segments[path] = entry
+    _hls_cache_bytes += len(entry[3])
+    while _hls_cache_bytes > HLS_CACHE_MAX_BYTES and len(_hls_segments) > 1:
+        _, evicted = _hls_segments.popitem(last=False)
+        _hls_cache_bytes -= len(evicted[3])
+
+
+async def _fetch_hls(path: str):
+    """Fetch a whole HLS file. Returns ((etag, content type, data), None) or (None, 502 response)."""
+    resp, error = await _open_upstream(f'http://127.0.0.1:8888/{path}')
+    if error is not None:
+        return None, error
+    try:
+        data = await resp.aread()
+    except httpx.HTTPError as e:
+        return None, JSONResponse({"error": str(e)}, status_code=502)
+    finally:
+        await resp.aclose()
+    ctype = resp.headers.get('Content-Type') or 'application/vnd.apple.mpegurl'
+    etag = '"' + hashlib.sha1(data).hexdigest()[:16] + '"'
+    return (etag, ctype, data), None
+
+
+@app.get('/proxy/hls/{path:path}')
+async def proxy_hls(path: str, request: Request):
+    """Proxy HLS files from the local MediaMTX HLS endpoint so the browser can fetch them."""
+    if path.endswith('.m3u8'):
+        # Playlists are tiny and change with every new segment: always refetch
+        fetched, error = await _fetch_hls(path)
+        if error is not None:
+            return error
+        etag, ctype, data = fetched
+        cache_control = 'max-age=1'
+    elif path.endswith(HLS_SEGMENT_SUFFIXES):
+        entry = _hls_segments.get(path)
+        if entry is not None and entry[0] > time.monotonic():
+            _hls_segments.move_to_end(path)
+        else:
+            fetched, error = await _fetch_hls(path)
+            if error is not None:
+                return error
+            entry = (time.monotonic() + HLS_SEGMENT_TTL, *fetched)
+            _cache_hls_segment(path, entry)
+        _, etag, ctype, data = entry
+        cache_control = f'max-age={int(HLS_SEGMENT_TTL)}'
+    else:
+        # Anything else is relayed as it arrives, uncached
+        resp, error = await _open_upstream(f'http://127.0.0.1:8888/{path}')
+        if error is not None:
+            return error
+        ctype = resp.headers.get('Content-Type') or 'application/vnd.apple.mpegurl'
+        return StreamingResponse(_relay(resp, "HLS Proxy"), media_type=ctype,
+                                 background=BackgroundTask(resp.aclose))
+
+    headers = {"Cache-Control": cache_control, "ETag": etag}
+    if request.headers.get('if-none-match') == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=data, media_type=ctype, headers=headers)
 
-    def stream():
-        try:
-            while True:
-                try:
-                    chunk = resp.read(4096)
-                    if not chunk:
-                        break
-                    yield chunk
-                except EOFError:
-                    # Client disconnected or stream ended
-                    break
-                except Exception as e:
-                    # Handle incomplete reads and other issues without crashing server
-                    print(f"[MJPEG Proxy] Stream read error: {e}")
-                    break
-        finally:
-            try:
-                resp.close()
-            except Exception:
-                pass
 
-    ctype = resp.getheader('Content-Type') or 'multipart/x-mixed-replace; boundary=frame'
-    return StreamingResponse(stream(), media_type=ctype)
+@app.get('/proxy/mjpeg')
+async def proxy_mjpeg():
+    """Proxy MJPEG multipart stream from the local MJPEG preview server."""
+    resp, error = await _open_upstream('http://127.0.0.1:8080/preview')
+    if error is not None:
+        return error
+    ctype = resp.headers.get('Content-Type') or 'multipart/x-mixed-replace; boundary=frame'
+    return StreamingResponse(_relay(resp, "MJPEG Proxy"), media_type=ctype,
+                             background=BackgroundTask(resp.aclose))
 
 
 if __name__ == "__main__":